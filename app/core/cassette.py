@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+
+RECORD = "record"
+REPLAY = "replay"
+
+class CassetteMissError(LookupError):
+    """Replay asked for a request that was never recorded."""
+
+def request_key(endpoint, params):
+    """
+    Stable key for a request: endpoint plus sorted params, without the API key
+    (so recordings are shareable and any key replays them) and without None values
+    (requests drops those before sending).
+    """
+    normalized = {k: str(v) for k, v in params.items() if k != "key" and v is not None}
+    raw = json.dumps([endpoint, sorted(normalized.items())], separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+class Cassette:
+    """
+    Recorded YouTube API responses in one SQLite file.
+    Bodies are zlib-compressed and stored once per distinct content, so repeated
+    requests and identical responses cost almost nothing on disk.
+    """
+
+    def __init__(self, path, mode=REPLAY):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"cassette mode must be '{RECORD}' or '{REPLAY}', not {mode!r}")
+        if mode == REPLAY and not os.path.exists(path):
+            raise FileNotFoundError(f"cassette not found: {path}")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS bodies (
+                body_hash TEXT PRIMARY KEY,
+                body BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS requests (
+                request_key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                params TEXT NOT NULL,
+                body_hash TEXT NOT NULL,
+                recorded_at TEXT NOT NULL
+            );
+        """)
+
+    @property
+    def replaying(self):
+        return self.mode == REPLAY
+
+    def play(self, endpoint, params):
+        """Recorded body bytes for this request; CassetteMissError if there are none."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT b.body FROM requests r JOIN bodies b ON b.body_hash = r.body_hash "
+                "WHERE r.request_key = ?",
+                (request_key(endpoint, params),),
+            ).fetchone()
+        if row is None:
+            shown = {k: v for k, v in params.items() if k != "key"}
+            raise CassetteMissError(f"no recording for {endpoint} {shown}")
+        return zlib.decompress(row[0])
+
+    def record(self, endpoint, params, body):
+        """Store a response body (bytes). Re-recording a request keeps the newest body."""
+        body_hash = hashlib.sha1(body).hexdigest()
+        stored_params = json.dumps({k: v for k, v in params.items() if k != "key" and v is not None})
+        with self.lock:
+            self.conn.execute("BEGIN")
+            self.conn.execute(
+                "INSERT OR IGNORE INTO bodies (body_hash, body) VALUES (?, ?)",
+                (body_hash, zlib.compress(body, 9)),
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO requests (request_key, endpoint, params, body_hash, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (request_key(endpoint, params), endpoint, stored_params, body_hash, datetime.now().isoformat()),
+            )
+            self.conn.execute("COMMIT")
+
+    def stats(self):
+        with self.lock:
+            requests_count = self.conn.execute("SELECT COUNT(*) FROM requests").fetchone()[0]
+            bodies, stored = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM bodies").fetchone()
+        return {"requests": requests_count, "bodies": bodies, "stored_bytes": stored}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+def cassette_from_env():
+    """Cassette named by YOUTUBE_API_CASSETTE (mode from YOUTUBE_API_CASSETTE_MODE, default replay)."""
+    path = os.environ.get("YOUTUBE_API_CASSETTE")
+    if not path:
+        return None
+    return Cassette(path, os.environ.get("YOUTUBE_API_CASSETTE_MODE", REPLAY))
@@ -0,0 +1,232 @@
+import csv
+import glob
+import math
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+DEFAULT_ROLLUPS = "data/channel_rollups.sqlite"
+
+# Score name -> SQL over the channels row (c) and its hit count ({hits}: all keywords or one)
+SCORES = {
+    "views": "c.total_views",
+    "subs": "c.subscriber_count",
+    "hits": "{hits}",
+    "videos": "c.videos",
+    "avg_views": "c.total_views * 1.0 / MAX(c.videos, 1)",
+    "views_per_sub": "c.total_views * 1.0 / NULLIF(c.subscriber_count, 0)",
+    "last_seen": "c.last_seen",
+}
+# Metrics that can be combined with weights (on a log scale, so views do not drown out hits)
+WEIGHTABLE = ("views", "subs", "hits", "videos", "avg_views")
+
+_EXPORT_DATE_RE = re.compile(r"results_(\d{4}-\d{2}-\d{2})\.csv$")
+_SUFFIXES = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+
+def _count(value):
+    """Export cell -> int or None. Older exports hold formatted counts like '152.8K'."""
+    text = str(value or "").strip().replace(",", "")
+    if not text or text == "-":
+        return None
+    try:
+        if text[-1].upper() in _SUFFIXES:
+            return int(float(text[:-1]) * _SUFFIXES[text[-1].upper()])
+        return int(float(text))
+    except ValueError:
+        return None
+
+def format_score(value):
+    """Score for display: 2 decimals for ratios and log-scale scores, grouped ints, dates as-is."""
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return f"{value:,}" if isinstance(value, int) else str(value)
+
+def parse_weights(text):
+    """'views=1,hits=2' -> {'views': 1.0, 'hits': 2.0}"""
+    weights = {}
+    for part in filter(None, (p.strip() for p in (text or "").split(","))):
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in WEIGHTABLE:
+            raise ValueError(f"unknown metric {name!r}; choose from {', '.join(WEIGHTABLE)}")
+        weights[name] = float(value) if value.strip() else 1.0
+    return weights
+
+class ChannelRollups:
+    """
+    Per-channel totals kept up to date as results are exported: latest subscriber
+    count, total views, videos, hits per keyword and first/last seen date.
+
+    Updates are idempotent per video: a video counts once towards its channel's
+    videos and views (at its highest observed view count) and once per keyword
+    towards hits, so re-exporting or rebuilding never double counts. Top-K is a
+    single query over one row per channel, however many exports there are.
+    """
+
+    def __init__(self, path=DEFAULT_ROLLUPS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.create_function("ln1p", 1, lambda x: math.log1p(max(x or 0, 0)), deterministic=True)
+        self.conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS channels (
+                channel_id TEXT PRIMARY KEY,
+                channel_title TEXT NOT NULL DEFAULT '',
+                subscriber_count INTEGER,
+                total_views INTEGER NOT NULL DEFAULT 0,
+                videos INTEGER NOT NULL DEFAULT 0,
+                hits INTEGER NOT NULL DEFAULT 0,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS channels_views ON channels (total_views);
+            CREATE INDEX IF NOT EXISTS channels_subs ON channels (subscriber_count);
+            CREATE INDEX IF NOT EXISTS channels_hits ON channels (hits);
+            CREATE TABLE IF NOT EXISTS channel_videos (
+                video_id TEXT PRIMARY KEY,
+                channel_id TEXT NOT NULL,
+                view_count INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS video_keywords (
+                video_id TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                PRIMARY KEY (video_id, keyword)
+            );
+            CREATE TABLE IF NOT EXISTS channel_keywords (
+                channel_id TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (channel_id, keyword)
+            );
+            CREATE INDEX IF NOT EXISTS channel_keywords_hits ON channel_keywords (keyword, hits);
+        """)
+
+    def _apply(self, video_id, channel_id, channel_title, subscriber_count, view_count, keyword, seen_date):
+        view_count = view_count or 0
+        self.conn.execute(
+            "INSERT INTO channels (channel_id, channel_title, subscriber_count, first_seen, last_seen) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (channel_id) DO UPDATE SET "
+            "channel_title = CASE WHEN excluded.channel_title != '' THEN excluded.channel_title ELSE channel_title END, "
+            "subscriber_count = CASE WHEN excluded.subscriber_count IS NOT NULL AND excluded.last_seen >= last_seen "
+            "THEN excluded.subscriber_count ELSE COALESCE(subscriber_count, excluded.subscriber_count) END, "
+            "first_seen = MIN(first_seen, excluded.first_seen), "
+            "last_seen = MAX(last_seen, excluded.last_seen)",
+            (channel_id, channel_title or "", subscriber_count, seen_date, seen_date),
+        )
+        row = self.conn.execute("SELECT view_count FROM channel_videos WHERE video_id = ?", (video_id,)).fetchone()
+        if row is None:
+            self.conn.execute(
+                "INSERT INTO channel_videos (video_id, channel_id, view_count) VALUES (?, ?, ?)",
+                (video_id, channel_id, view_count),
+            )
+            self.conn.execute(
+                "UPDATE channels SET videos = videos + 1, total_views = total_views + ? WHERE channel_id = ?",
+                (view_count, channel_id),
+            )
+        elif view_count > row["view_count"]:
+            self.conn.execute("UPDATE channel_videos SET view_count = ? WHERE video_id = ?", (view_count, video_id))
+            self.conn.execute(
+                "UPDATE channels SET total_views = total_views + ? WHERE channel_id = ?",
+                (view_count - row["view_count"], channel_id),
+            )
+        if keyword:
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO video_keywords (video_id, keyword) VALUES (?, ?)", (video_id, keyword)
+            )
+            if cur.rowcount == 1:
+                self.conn.execute("UPDATE channels SET hits = hits + 1 WHERE channel_id = ?", (channel_id,))
+                self.conn.execute(
+                    "INSERT INTO channel_keywords (channel_id, keyword, hits) VALUES (?, ?, 1) "
+                    "ON CONFLICT (channel_id, keyword) DO UPDATE SET hits = hits + 1",
+                    (channel_id, keyword),
+                )
+
+    def update(self, records, keyword="", seen_date=None):
+        """Fold one exported batch of VideoRecords in. keyword is used for records without their own."""
+        seen_date = seen_date or datetime.now().strftime("%Y-%m-%d")
+        with self.conn:
+            for r in records:
+                if not r.channel_id:
+                    continue
+                self._apply(r.video_id, r.channel_id, r.channel_title, r.subscriber_count,
+                            r.view_count, r.keyword or keyword, seen_date)
+
+    def rebuild_from_exports(self, export_dir="export"):
+        """
+        Recompute everything from export/results_*.csv (one-off backfill).
+        Keywords are taken from the export's keyword column as written.
+        Returns the number of rows read.
+        """
+        rows_read = 0
+        with self.conn:
+            for table in ("channels", "channel_videos", "video_keywords", "channel_keywords"):
+                self.conn.execute(f"DELETE FROM {table}")
+            for path in sorted(glob.glob(os.path.join(export_dir, "results_*.csv"))):
+                match = _EXPORT_DATE_RE.search(path)
+                seen_date = match.group(1) if match else datetime.now().strftime("%Y-%m-%d")
+                with open(path, "r", encoding="utf-8", newline="") as f:
+                    for row in csv.DictReader(f):
+                        if not row.get("video_id") or not row.get("channel_id"):
+                            continue
+                        self._apply(row["video_id"], row["channel_id"], row.get("channel_title"),
+                                    _count(row.get("subscriber_count")), _count(row.get("view_count")),
+                                    row.get("keyword", ""), seen_date)
+                        rows_read += 1
+        return rows_read
+
+    def top(self, k=20, score="views", weights=None, keyword=None, min_videos=1):
+        """
+        Top k channels as dicts, best first. Rank by a named score from SCORES, or by
+        weights ({metric: weight}, summed on a log scale). With keyword, only channels
+        hit by that keyword are ranked and 'hits' counts that keyword alone.
+        """
+        hits = "k.hits" if keyword else "c.hits"
+        if weights:
+            unknown = set(weights) - set(WEIGHTABLE)
+            if unknown:
+                raise ValueError(f"unknown metric(s) {', '.join(sorted(unknown))}; choose from {', '.join(WEIGHTABLE)}")
+            expr = " + ".join(
+                f"{float(w)} * ln1p({SCORES[name].format(hits=hits)})" for name, w in weights.items()
+            )
+        elif score in SCORES:
+            expr = SCORES[score].format(hits=hits)
+        else:
+            raise ValueError(f"unknown score {score!r}; choose from {', '.join(SCORES)}")
+
+        join = "JOIN channel_keywords k ON k.channel_id = c.channel_id AND k.keyword = ?" if keyword else ""
+        params = ([keyword] if keyword else []) + [min_videos, k]
+        rows = self.conn.execute(
+            f"SELECT c.*, {hits} AS keyword_hits, {expr} AS score FROM channels c {join} "
+            f"WHERE c.videos >= ? ORDER BY score IS NULL, score DESC LIMIT ?",
+            params,
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def top_keywords(self, channel_id, limit=3):
+        """A channel's keywords with the most hits: [(keyword, hits), ...]"""
+        return [(r["keyword"], r["hits"]) for r in self.conn.execute(
+            "SELECT keyword, hits FROM channel_keywords WHERE channel_id = ? ORDER BY hits DESC, keyword LIMIT ?",
+            (channel_id, limit),
+        )]
+
+    def keywords(self):
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT keyword FROM channel_keywords ORDER BY keyword")]
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM channels").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+def update_rollups(records, keyword="", path=DEFAULT_ROLLUPS):
+    """Open the rollup store, fold in one batch, close."""
+    rollups = ChannelRollups(path)
+    try:
+        rollups.update(records, keyword=keyword)
+    finally:
+        rollups.close()
@@ -0,0 +1,94 @@
+import json
+import os
+from datetime import datetime
+
+DEFAULT_CHECKPOINT = "data/checkpoint.json"
+
+def new_checkpoint(keywords):
+    """
+    Fresh run state. Position is (keyword_index, page) plus the page token for
+    that page; pending_ids holds search results whose details are not fetched yet.
+    Results live in a JSONL sidecar (see results_path); the checkpoint only keeps
+    results_offset, the sidecar size that belongs to this state.
+    """
+    return {
+        "keywords": list(keywords),
+        "keyword_index": 0,
+        "page": 0,
+        "page_token": None,
+        "pending_ids": None,
+        "next_page_token": None,
+        "results_offset": 0,
+        "quota_used": 0,
+        "key_ledger": {},
+        "quota_day": None,
+        "updated_at": None,
+    }
+
+def load_checkpoint(path=DEFAULT_CHECKPOINT):
+    """Return the saved run state, or None if there is nothing to resume."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_checkpoint(state, path=DEFAULT_CHECKPOINT):
+    """Write state atomically so a crash mid-write never leaves a torn file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    state["updated_at"] = datetime.now().isoformat()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+def results_path(path=DEFAULT_CHECKPOINT):
+    """Sidecar holding the run's results, one JSON object per line."""
+    return os.path.splitext(path)[0] + ".results.jsonl"
+
+def restore_results(state, path=DEFAULT_CHECKPOINT):
+    """
+    Make the sidecar match state before appending to it: bytes written after the
+    last checkpoint (a page that will be redone) are cut off. Older checkpoints
+    that kept results inline are moved to the sidecar.
+    """
+    sidecar = results_path(path)
+    offset = state.get("results_offset", 0)
+    if os.path.exists(sidecar):
+        with open(sidecar, "r+b") as f:
+            f.truncate(offset)
+    elif offset:
+        raise ValueError(f"checkpoint results missing: {sidecar}")
+    legacy = state.pop("results", None)
+    if legacy:
+        append_results(state, legacy, path)
+
+def append_results(state, results, path=DEFAULT_CHECKPOINT):
+    """Append result dicts to the sidecar and advance state's results_offset."""
+    if not results:
+        return
+    sidecar = results_path(path)
+    os.makedirs(os.path.dirname(sidecar) or ".", exist_ok=True)
+    with open(sidecar, "ab") as f:
+        for result in results:
+            f.write(json.dumps(result).encode("utf-8") + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+        state["results_offset"] = f.tell()
+
+def load_results(state, path=DEFAULT_CHECKPOINT):
+    """Result dicts recorded up to state's results_offset."""
+    sidecar = results_path(path)
+    offset = state.get("results_offset", 0)
+    if not offset or not os.path.exists(sidecar):
+        return []
+    with open(sidecar, "rb") as f:
+        data = f.read(offset)
+    return [json.loads(line) for line in data.splitlines() if line.strip()]
+
+def clear_checkpoint(path=DEFAULT_CHECKPOINT):
+    for p in (path, results_path(path)):
+        if os.path.exists(p):
+            os.remove(p)
@@ -1,10 +1,14 @@
 import csv
 import os
 from datetime import datetime
+from core.channel_rollups import update_rollups, DEFAULT_ROLLUPS
 
-def save_results_csv(results, keyword, out_dir="export"):
+def save_results_csv(results, keyword, out_dir="export", rollup_path=DEFAULT_ROLLUPS):
     """
-    Save results to daily CSV. Each result: dict with all columns.
+    Save results to daily CSV. Each result: VideoRecord.
+    Appends, so several runs on the same day (searches, channel crawls) all land in one file.
+    keyword is written for records that do not carry the keyword that found them.
+    The same batch is folded into the channel rollups (rollup_path=None to skip).
     """
     date_str = datetime.now().strftime("%Y-%m-%d")
     filename = os.path.join(out_dir, f"results_{date_str}.csv")
@@ -14,24 +18,28 @@ def save_results_csv(results, keyword, out_dir="export"):
         "channel_id", "subscriber_count", "view_count", "duration_minutes",
         "published_at", "keyword"
     ]
-    with open(filename, "w", encoding="utf-8", newline="") as f:
+    file_exists = os.path.exists(filename)
+    with open(filename, "a", encoding="utf-8", newline="") as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+        if not file_exists:
+            writer.writeheader()
         for r in results:
             writer.writerow({
-                "title": r.get("title", ""),
-                "description": r.get("description", ""),
-                "tags": ",".join(r.get("tags", [])),
-                "video_url": f"https://www.youtube.com/watch?v={r.get('video_id', '')}",
-                "video_id": r.get("video_id", ""),
-                "channel_title": r.get("channel_title", ""),
-                "channel_id": r.get("channel_id", ""),
-                "subscriber_count": r.get("subscriber_count", ""),
-                "view_count": r.get("view_count", ""),
-                "duration_minutes": r.get("duration_minutes", ""),
-                "published_at": r.get("published_at", ""),
-                "keyword": keyword
+                "title": r.title,
+                "description": r.description,
+                "tags": ",".join(r.tags),
+                "video_url": r.video_url,
+                "video_id": r.video_id,
+                "channel_title": r.channel_title,
+                "channel_id": r.channel_id,
+                "subscriber_count": "" if r.subscriber_count is None else r.subscriber_count,
+                "view_count": r.view_count,
+                "duration_minutes": r.duration_minutes,
+                "published_at": r.published_at,
+                "keyword": r.keyword or keyword
             })
+    if rollup_path:
+        update_rollups(results, keyword=keyword, path=rollup_path)
 
 def append_seen_history(video_id, out_file="data/seen_history.csv"):
     os.makedirs(os.path.dirname(out_file), exist_ok=True)
@@ -69,4 +77,50 @@ def log_run(keywords_count=0, results_count=0, quota_used=0, error=None, log_dir
             keywords_count,
             results_count,
             error or ""
-        ])
\ No newline at end of file
+        ])
+
+def log_key_usage(key_usage, log_dir="logs"):
+    """
+    Logs per-key quota spend for a run to key_usage.csv
+    Columns: run_timestamp, key, quota_used, calls, cap, retired
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    log_file = os.path.join(log_dir, "key_usage.csv")
+    file_exists = os.path.exists(log_file)
+    run_timestamp = datetime.now().isoformat()
+
+    with open(log_file, "a", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(["run_timestamp", "key", "quota_used", "calls", "cap", "retired"])
+        for usage in key_usage:
+            writer.writerow([
+                run_timestamp,
+                usage["key"],
+                usage["quota_used"],
+                usage["calls"],
+                usage["cap"],
+                usage["retired"]
+            ])
+
+
+def log_transfer(stats, log_dir="logs"):
+    """
+    Logs per-run API bandwidth to transfer.csv
+    Columns: run_timestamp, requests, bytes_on_wire, bytes_decoded, bytes_saved
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    log_file = os.path.join(log_dir, "transfer.csv")
+    file_exists = os.path.exists(log_file)
+
+    with open(log_file, "a", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(["run_timestamp", "requests", "bytes_on_wire", "bytes_decoded", "bytes_saved"])
+        writer.writerow([
+            datetime.now().isoformat(),
+            stats["requests"],
+            stats["bytes_on_wire"],
+            stats["bytes_decoded"],
+            stats["bytes_saved"]
+        ])
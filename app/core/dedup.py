@@ -0,0 +1,193 @@
+import os
+import re
+import random
+import sqlite3
+import struct
+import zlib
+
+import numpy as np
+
+DEFAULT_INDEX = "data/near_duplicates.sqlite"
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+# Fixed seed: signatures must stay comparable across runs and machines
+_rng = random.Random(1)
+_PERMS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+# Words that mark a variant of the same content rather than different content
+VARIANT_WORDS = {
+    "official", "video", "audio", "lyric", "lyrics", "lyrical", "slowed", "reverb", "sped", "up",
+    "speed", "nightcore", "lofi", "lo", "fi", "full", "song", "songs", "hd", "4k", "hq", "new",
+    "version", "visualizer", "mv", "music", "remastered", "8d", "bass", "boosted",
+}
+DESCRIPTION_CHARS = 300
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+def _tokens(text):
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in VARIANT_WORDS]
+
+def shingles(title, tags=None, description=""):
+    """Normalized feature set: title words and word pairs, tags, start of the description."""
+    title_tokens = _tokens(title or "")
+    features = set(title_tokens)
+    features.update(f"{a} {b}" for a, b in zip(title_tokens, title_tokens[1:]))
+    for tag in tags or []:
+        tag_tokens = _tokens(tag)
+        if tag_tokens:
+            features.add("#" + " ".join(tag_tokens))
+    features.update("d:" + t for t in _tokens((description or "")[:DESCRIPTION_CHARS]))
+    return features
+
+# Permutation coefficients as column vectors, a split into 32-bit halves (see minhash)
+_A = np.array([a for a, _ in _PERMS], dtype=np.uint64)[:, None]
+_B = np.array([b for _, b in _PERMS], dtype=np.uint64)[:, None]
+_A_HI = _A >> np.uint64(32)
+_A_LO = _A & np.uint64(MAX_HASH)
+_M61 = np.uint64(MERSENNE_PRIME)
+
+def _mod61(x):
+    """x mod 2**61 - 1 for uint64 x, using 2**61 = 1 (mod p)."""
+    x = (x & _M61) + (x >> np.uint64(61))
+    return np.where(x >= _M61, x - _M61, x)
+
+def minhash(features):
+    """
+    NUM_PERM 32-bit MinHash values, or None for an empty feature set.
+    All permutations are applied at once: (a * h + b) mod p needs up to 93 bits, so
+    a is split into 32-bit halves and each partial product is reduced mod p in uint64.
+    Values are identical to the scalar formula, so stored signatures stay comparable.
+    """
+    if not features:
+        return None
+    h = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint64, count=len(features))
+    # a_hi * h < 2**61; shifting it up by 32 bits wraps at 2**61, i.e. mod p
+    hi = _A_HI * h
+    hi = ((hi & np.uint64((1 << 29) - 1)) << np.uint64(32)) + (hi >> np.uint64(29))
+    lo = _mod61(_A_LO * h)  # a_lo * h < 2**64
+    x = _mod61(_mod61(hi) + lo + _B)
+    return (x & np.uint64(MAX_HASH)).min(axis=1).tolist()
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+def _band_keys(sig):
+    keys = []
+    for band in range(BANDS):
+        chunk = sig[band * ROWS:(band + 1) * ROWS]
+        bucket = zlib.crc32(struct.pack(f"<{ROWS}I", *chunk))
+        # One integer key per (band, bucket) so a single indexed IN query finds all candidates
+        keys.append(band << 32 | bucket)
+    return keys
+
+class NearDuplicateIndex:
+    """
+    Persistent MinHash/LSH index that groups re-uploads and lyric/slowed/reverb
+    variants into clusters. Each cluster keeps its highest-view member as the
+    representative. Lookups are one indexed SQLite query, so they stay fast as
+    the corpus grows.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX, threshold=0.6):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.threshold = threshold
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS videos (
+                video_id TEXT PRIMARY KEY,
+                cluster_id TEXT NOT NULL,
+                views INTEGER NOT NULL DEFAULT 0,
+                sig BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS videos_cluster ON videos (cluster_id, views);
+            CREATE TABLE IF NOT EXISTS lsh (
+                key INTEGER NOT NULL,
+                video_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS lsh_key ON lsh (key);
+        """)
+
+    def find_match(self, sig):
+        """Most similar indexed video above threshold as (video_id, cluster_id), or None."""
+        keys = _band_keys(sig)
+        rows = self.conn.execute(
+            f"SELECT DISTINCT v.video_id, v.cluster_id, v.sig FROM lsh l "
+            f"JOIN videos v ON v.video_id = l.video_id "
+            f"WHERE l.key IN ({','.join('?' * len(keys))})",
+            keys,
+        ).fetchall()
+        best, best_score = None, self.threshold
+        for video_id, cluster_id, blob in rows:
+            score = similarity(sig, struct.unpack(f"<{NUM_PERM}I", blob))
+            if score >= best_score:
+                best, best_score = (video_id, cluster_id), score
+        return best
+
+    def add(self, video_id, title, tags=None, description="", views=0):
+        """
+        Index a video and return its cluster_id. A video already indexed keeps
+        its cluster (views are refreshed). Unmatched videos start their own cluster.
+        """
+        row = self.conn.execute("SELECT cluster_id FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        if row:
+            self.conn.execute("UPDATE videos SET views = ? WHERE video_id = ?", (int(views or 0), video_id))
+            return row[0]
+        sig = minhash(shingles(title, tags, description))
+        if sig is None:
+            return video_id
+        match = self.find_match(sig)
+        cluster_id = match[1] if match else video_id
+        self.conn.execute(
+            "INSERT INTO videos (video_id, cluster_id, views, sig) VALUES (?, ?, ?, ?)",
+            (video_id, cluster_id, int(views or 0), struct.pack(f"<{NUM_PERM}I", *sig)),
+        )
+        self.conn.executemany(
+            "INSERT INTO lsh (key, video_id) VALUES (?, ?)",
+            [(key, video_id) for key in _band_keys(sig)],
+        )
+        return cluster_id
+
+    def representative(self, cluster_id):
+        """Highest-view video ID in a cluster."""
+        row = self.conn.execute(
+            "SELECT video_id FROM videos WHERE cluster_id = ? ORDER BY views DESC LIMIT 1",
+            (cluster_id,),
+        ).fetchone()
+        return row[0] if row else cluster_id
+
+    def cluster_members(self, cluster_id):
+        return [r[0] for r in self.conn.execute(
+            "SELECT video_id FROM videos WHERE cluster_id = ? ORDER BY views DESC", (cluster_id,)
+        )]
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        """Forget index entries added since the last commit."""
+        self.conn.rollback()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+def collapse_near_duplicates(results, index, commit=True):
+    """
+    Drop VideoRecords that are variants of content already exported, keeping only the
+    best representative per cluster. Results are indexed best-first so the
+    highest-view variant in a batch founds the cluster.
+    With commit=False the new index entries stay pending until index.commit()
+    (or are dropped by index.rollback()).
+    """
+    for r in sorted(results, key=lambda r: r.view_count, reverse=True):
+        r.cluster_id = index.add(r.video_id, r.title, r.tags, r.description, views=r.view_count)
+    if commit:
+        index.commit()
+    return [r for r in results if index.representative(r.cluster_id) == r.video_id]
@@ -1,5 +1,3 @@
-import isodate
-
 def filter_videos(
     videos, 
     views_min=None, views_max=None,
@@ -11,44 +9,35 @@ def filter_videos(
 ):
     """
     Filter videos by views, duration, region, language, subscribers, and hidden subs.
-    channels_info: dict of channel_id -> {subscriberCount, hiddenSubscriberCount}
+    videos: list of VideoRecord
+    channels_info: dict of channel_id -> ChannelRecord
+    region is applied by search.list (regionCode); video resources carry no region to check.
     Returns filtered list.
     """
     filtered = []
     for v in videos:
-        stats = v.get("statistics", {})
-        snippet = v.get("snippet", {})
-        content = v.get("contentDetails", {})
-        channel_id = snippet.get("channelId")
-        region_code = snippet.get("regionCode", None)
-        lang_code = snippet.get("defaultLanguage", None)
-        
         # Views filter
-        views = int(stats.get("viewCount", "0"))
+        views = v.view_count
         if views_min is not None and views < views_min:
             continue
         if views_max is not None and views > views_max:
             continue
 
         # Duration filter
-        dur = isodate.parse_duration(content.get("duration", "PT0S")).total_seconds() // 60
+        dur = v.duration_minutes
         if duration_min is not None and dur < duration_min:
             continue
         if duration_max is not None and dur > duration_max:
             continue
 
-        # Region filter
-        if region and region_code and region_code != region:
-            continue
-
         # Language filter
-        if language and lang_code and lang_code != language:
+        if language and v.default_language and v.default_language != language:
             continue
 
         # Subscribers filter
-        chinfo = channels_info.get(channel_id, {}) if channels_info else {}
-        subs = int(chinfo.get("subscriberCount", "0")) if "subscriberCount" in chinfo else None
-        hidden = chinfo.get("hiddenSubscriberCount", False)
+        chinfo = channels_info.get(v.channel_id) if channels_info else None
+        subs = chinfo.subscriber_count if chinfo else None
+        hidden = chinfo.hidden_subscriber_count if chinfo else False
         if skip_hidden_subs and hidden:
             continue
         if subs_min is not None and subs is not None and subs < subs_min:
@@ -57,4 +46,4 @@ def filter_videos(
             continue
 
         filtered.append(v)
-    return filtered
\ No newline at end of file
+    return filtered
@@ -0,0 +1,216 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from datetime import datetime
+
+DEFAULT_QUEUE = "data/queue.sqlite"
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+
+class JobQueue:
+    """
+    Durable keyword/page task queue shared by worker processes through SQLite.
+
+    - A run holds the saved settings and one global quota budget (api_cap).
+    - Workers claim tasks under a lease; an expired lease returns the task to the pool.
+    - Quota is reserved from the run budget before each paid call, atomically, so
+      the cap holds across every worker.
+    - complete() stores results and marks the task done in one transaction, and only
+      while the worker still holds the lease, so each task's results land exactly once.
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                settings TEXT NOT NULL,
+                quota_cap INTEGER NOT NULL,
+                quota_used INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                exported INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                page_token TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                error TEXT,
+                UNIQUE (run_id, keyword, page)
+            );
+            CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires);
+            CREATE TABLE IF NOT EXISTS results (
+                run_id TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                task_id INTEGER NOT NULL,
+                record TEXT NOT NULL,
+                PRIMARY KEY (run_id, video_id)
+            );
+        """)
+
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front so two workers cannot claim the same row
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def create_run(self, settings):
+        """Queue page 0 of every keyword. Returns the new run_id."""
+        run_id = datetime.now().strftime("%Y%m%dT%H%M%S-") + uuid.uuid4().hex[:6]
+        self._transaction()
+        try:
+            self.conn.execute(
+                "INSERT INTO runs (run_id, settings, quota_cap, created_at) VALUES (?, ?, ?, ?)",
+                (run_id, json.dumps(settings), settings.get("api_cap", 9500), datetime.now().isoformat()),
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO tasks (run_id, keyword, page) VALUES (?, ?, 0)",
+                [(run_id, kw) for kw in settings.get("keywords", [])],
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return run_id
+
+    def run_settings(self, run_id):
+        row = self.conn.execute("SELECT settings FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return json.loads(row["settings"]) if row else None
+
+    def claim(self, owner, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """Lease the oldest pending (or lease-expired) task. Returns a dict or None."""
+        now = time.time()
+        self._transaction()
+        try:
+            row = self.conn.execute(
+                "SELECT * FROM tasks WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+                "AND attempts < ? ORDER BY task_id LIMIT 1",
+                (now, max_attempts),
+            ).fetchone()
+            if row is None:
+                # Leases that expired on their last attempt will never be claimed again
+                self.conn.execute(
+                    "UPDATE tasks SET status = 'failed', error = COALESCE(error, 'lease expired') "
+                    "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                    (now, max_attempts),
+                )
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE task_id = ?",
+                (owner, now + lease_seconds, row["task_id"]),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        task = dict(row)
+        task["attempts"] += 1
+        return task
+
+    def reserve_quota(self, run_id, units):
+        """Take units from the run's global budget. False when the cap would be exceeded."""
+        cur = self.conn.execute(
+            "UPDATE runs SET quota_used = quota_used + ? WHERE run_id = ? AND quota_used + ? <= quota_cap",
+            (units, run_id, units),
+        )
+        return cur.rowcount == 1
+
+    def adjust_quota(self, run_id, delta):
+        """Correct a reservation once the real spend is known (delta may be negative)."""
+        self.conn.execute("UPDATE runs SET quota_used = MAX(quota_used + ?, 0) WHERE run_id = ?", (delta, run_id))
+
+    def complete(self, task, owner, records, next_page_token=None, pages_per_keyword=1):
+        """
+        Commit a task's results exactly once. Queues the next page when there is one.
+        Returns False (and writes nothing) if the lease was lost to another worker.
+        """
+        self._transaction()
+        try:
+            cur = self.conn.execute(
+                "UPDATE tasks SET status = 'done', lease_owner = NULL, lease_expires = NULL, error = NULL "
+                "WHERE task_id = ? AND status = 'leased' AND lease_owner = ?",
+                (task["task_id"], owner),
+            )
+            if cur.rowcount != 1:
+                self.conn.execute("ROLLBACK")
+                return False
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO results (run_id, video_id, task_id, record) VALUES (?, ?, ?, ?)",
+                [(task["run_id"], r.video_id, task["task_id"], json.dumps(r.to_dict())) for r in records],
+            )
+            if next_page_token and task["page"] + 1 < pages_per_keyword:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO tasks (run_id, keyword, page, page_token) VALUES (?, ?, ?, ?)",
+                    (task["run_id"], task["keyword"], task["page"] + 1, next_page_token),
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def fail(self, task, owner, error, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """Give the task back for a retry, or mark it failed after max_attempts."""
+        status = "failed" if task["attempts"] >= max_attempts else "pending"
+        self.conn.execute(
+            "UPDATE tasks SET status = ?, lease_owner = NULL, lease_expires = NULL, error = ? "
+            "WHERE task_id = ? AND lease_owner = ?",
+            (status, str(error)[:500], task["task_id"], owner),
+        )
+
+    def release(self, task, owner):
+        """Hand a task back untouched (e.g. no budget left); the attempt is not counted."""
+        self.conn.execute(
+            "UPDATE tasks SET status = 'pending', lease_owner = NULL, lease_expires = NULL, "
+            "attempts = MAX(attempts - 1, 0) WHERE task_id = ? AND lease_owner = ?",
+            (task["task_id"], owner),
+        )
+
+    def status(self, run_id):
+        counts = {r["status"]: r["n"] for r in self.conn.execute(
+            "SELECT status, COUNT(*) AS n FROM tasks WHERE run_id = ? GROUP BY status", (run_id,)
+        )}
+        run = self.conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        results = self.conn.execute("SELECT COUNT(*) FROM results WHERE run_id = ?", (run_id,)).fetchone()[0]
+        return {
+            "tasks": counts,
+            "results": results,
+            "quota_used": run["quota_used"] if run else 0,
+            "quota_cap": run["quota_cap"] if run else 0,
+            "exported": bool(run["exported"]) if run else False,
+        }
+
+    def is_finished(self, run_id):
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE run_id = ? AND status IN ('pending', 'leased')", (run_id,)
+        ).fetchone()
+        return row[0] == 0
+
+    def results(self, run_id):
+        """Committed result dicts for a run, in commit order."""
+        return [json.loads(r["record"]) for r in self.conn.execute(
+            "SELECT record FROM results WHERE run_id = ? ORDER BY task_id, rowid", (run_id,)
+        )]
+
+    def mark_exported(self, run_id):
+        """Flip the exported flag once. False if another coordinator already exported this run."""
+        cur = self.conn.execute("UPDATE runs SET exported = 1 WHERE run_id = ? AND exported = 0", (run_id,))
+        return cur.rowcount == 1
+
+    def open_runs(self):
+        return [r["run_id"] for r in self.conn.execute(
+            "SELECT run_id FROM runs WHERE exported = 0 ORDER BY created_at"
+        )]
+
+    def close(self):
+        self.conn.close()
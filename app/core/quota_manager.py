@@ -0,0 +1,139 @@
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+
+QUOTA_EXCEEDED_REASONS = ("quotaExceeded", "dailyLimitExceeded")
+
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+except Exception:
+    # No tz database (e.g. Windows without tzdata): Pacific standard time is close enough
+    QUOTA_TZ = timezone(timedelta(hours=-8))
+
+def quota_day(now=None):
+    """The quota day (quota resets at midnight Pacific) as an ISO date string."""
+    return (now or datetime.now(QUOTA_TZ)).astimezone(QUOTA_TZ).date().isoformat()
+
+class ApiKey:
+    """One API key with its own daily cap and spend ledger."""
+
+    def __init__(self, key, cap=9500):
+        self.key = key
+        self.cap = cap
+        self.used = 0
+        self.calls = 0
+        self.retired = False
+
+    @property
+    def remaining(self):
+        return 0 if self.retired else max(self.cap - self.used, 0)
+
+    @property
+    def fingerprint(self):
+        """Stable short ID for saved state; the key itself is never written to disk."""
+        return hashlib.sha1(self.key.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def label(self):
+        """Masked key for logs, never the full secret."""
+        return f"...{self.key[-4:]}" if len(self.key) > 4 else "..."
+
+class KeyPool:
+    """
+    Routes each request to the key with the most remaining budget.
+    keys: list of key strings, or dicts {"key": ..., "cap": ...} for per-key caps.
+    """
+
+    def __init__(self, keys, cap=9500):
+        self.keys = []
+        for k in keys:
+            if isinstance(k, dict):
+                self.keys.append(ApiKey(k["key"], k.get("cap", cap)))
+            else:
+                self.keys.append(ApiKey(k, cap))
+        if not self.keys:
+            raise ValueError("KeyPool needs at least one API key")
+
+    @classmethod
+    def from_env(cls, cap=9500):
+        """Build from YOUTUBE_API_KEYS (comma separated) or YOUTUBE_API_KEY."""
+        raw = os.environ.get("YOUTUBE_API_KEYS") or os.environ.get("YOUTUBE_API_KEY") or ""
+        keys = [k.strip() for k in raw.split(",") if k.strip()]
+        return cls(keys, cap=cap) if keys else None
+
+    @property
+    def cap(self):
+        return sum(k.cap for k in self.keys)
+
+    @property
+    def remaining(self):
+        return sum(k.remaining for k in self.keys)
+
+    def acquire(self, cost):
+        """Return the key with the most remaining budget that can pay cost, or None."""
+        best = max(self.keys, key=lambda k: k.remaining)
+        return best if best.remaining >= cost else None
+
+    def charge(self, api_key, cost):
+        api_key.used += cost
+        api_key.calls += 1
+
+    def retire(self, api_key):
+        api_key.retired = True
+
+    def ledger(self):
+        """Spend per key fingerprint, for checkpoints."""
+        return {k.fingerprint: k.used for k in self.keys}
+
+    def seed(self, ledger=None, total=0):
+        """
+        Catch up with spend recorded by an earlier process (e.g. on resume): each key is
+        raised to its saved spend in ledger, and if the pool still accounts for less than
+        total (older checkpoints, changed keys) the gap is charged to the keys with the
+        most budget left. Spend this pool already counted is not added twice.
+        Returns the units added.
+        """
+        ledger = ledger or {}
+        seeded = 0
+        for k in self.keys:
+            saved = ledger.get(k.fingerprint, 0)
+            if saved > k.used:
+                seeded += saved - k.used
+                k.used = saved
+        rest = max(total - sum(k.used for k in self.keys), 0)
+        for k in sorted(self.keys, key=lambda k: k.remaining, reverse=True):
+            if rest <= 0:
+                break
+            take = min(rest, k.remaining)
+            k.used += take
+            rest -= take
+            seeded += take
+        if rest > 0:
+            # More was spent than the keys can hold: leave nothing to spend
+            self.keys[0].used += rest
+            seeded += rest
+        return seeded
+
+    def usage(self):
+        """Per-key spend summary for the run log."""
+        return [
+            {
+                "key": k.label,
+                "quota_used": k.used,
+                "calls": k.calls,
+                "cap": k.cap,
+                "retired": k.retired,
+            }
+            for k in self.keys
+        ]
+
+def is_quota_exceeded(resp):
+    """True if an API error response says the key has run out of quota."""
+    if resp.status_code != 403:
+        return False
+    try:
+        errors = resp.json().get("error", {}).get("errors", [])
+    except ValueError:
+        return False
+    return any(e.get("reason") in QUOTA_EXCEEDED_REASONS for e in errors)
@@ -0,0 +1,187 @@
+import sys
+
+import isodate
+
+def _int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+def _intern(value):
+    return sys.intern(value) if value else ""
+
+class ChannelRecord:
+    """Channel stats parsed once from a channels.list item."""
+    __slots__ = ("channel_id", "subscriber_count", "hidden_subscriber_count")
+
+    def __init__(self, channel_id, subscriber_count=None, hidden_subscriber_count=False):
+        self.channel_id = channel_id
+        self.subscriber_count = subscriber_count
+        self.hidden_subscriber_count = hidden_subscriber_count
+
+    @classmethod
+    def from_api(cls, item):
+        stats = item.get("statistics", {})
+        subs = stats.get("subscriberCount")
+        return cls(
+            _intern(item["id"]),
+            _int(subs) if subs is not None else None,
+            bool(stats.get("hiddenSubscriberCount", False)),
+        )
+
+class VideoRecord:
+    """
+    One video as it moves through filter, dedup and export. Built once from the
+    videos.list item with numbers already typed and repeated strings (channel,
+    tags, keyword) interned. keyword, subscriber_count and cluster_id are filled
+    in by the pipeline.
+    """
+    __slots__ = (
+        "video_id", "title", "description", "tags", "channel_id", "channel_title",
+        "published_at", "default_language", "view_count", "duration_seconds",
+        "subscriber_count", "keyword", "cluster_id",
+    )
+
+    def __init__(self, video_id, title="", description="", tags=(), channel_id="", channel_title="",
+                 published_at="", default_language="", view_count=0, duration_seconds=0,
+                 subscriber_count=None, keyword="", cluster_id=None):
+        self.video_id = video_id
+        self.title = title
+        self.description = description
+        self.tags = tags
+        self.channel_id = channel_id
+        self.channel_title = channel_title
+        self.published_at = published_at
+        self.default_language = default_language
+        self.view_count = view_count
+        self.duration_seconds = duration_seconds
+        self.subscriber_count = subscriber_count
+        self.keyword = keyword
+        self.cluster_id = cluster_id
+
+    @classmethod
+    def from_api(cls, item, keep_description=True):
+        """Parse a videos.list item. keep_description=False drops the largest text field."""
+        snippet = item.get("snippet", {})
+        stats = item.get("statistics", {})
+        content = item.get("contentDetails", {})
+        try:
+            duration_seconds = int(isodate.parse_duration(content.get("duration", "PT0S")).total_seconds())
+        except Exception:
+            duration_seconds = 0
+        return cls(
+            video_id=item["id"],
+            title=snippet.get("title", ""),
+            description=snippet.get("description", "") if keep_description else "",
+            tags=tuple(_intern(t) for t in snippet.get("tags", ())),
+            channel_id=_intern(snippet.get("channelId", "")),
+            channel_title=_intern(snippet.get("channelTitle", "")),
+            published_at=snippet.get("publishedAt", "")[:10],
+            default_language=_intern(snippet.get("defaultLanguage", "")),
+            view_count=_int(stats.get("viewCount")),
+            duration_seconds=duration_seconds,
+        )
+
+    @property
+    def duration_minutes(self):
+        return self.duration_seconds // 60
+
+    @property
+    def video_url(self):
+        return f"https://www.youtube.com/watch?v={self.video_id}"
+
+    def to_dict(self):
+        """Plain dict for JSON checkpoints."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data["tags"] = tuple(_intern(t) for t in data.get("tags", ()))
+        for name in ("channel_id", "channel_title", "default_language", "keyword"):
+            data[name] = _intern(data.get(name, ""))
+        return cls(**{k: v for k, v in data.items() if k in cls.__slots__})
+
+def benchmark_memory(n=100_000):
+    """
+    Compare memory held by n synthetic videos as the old per-result dicts against
+    n VideoRecords. Raw API items are dropped after each one is converted, as the old
+    pipeline did after each batch. Returns (dict_bytes, record_bytes).
+    """
+    import random
+    import tracemalloc
+
+    rng = random.Random(0)
+    channels = [f"UC{i:022d}" for i in range(n // 50 or 1)]
+    tag_pool = [f"tag{i}" for i in range(500)]
+
+    def make_item(i):
+        channel = rng.choice(channels)
+        # json.loads builds fresh strings for every item, so copy shared values the same way
+        return {
+            "id": f"vid{i:08d}",
+            "snippet": {
+                "title": f"Synthetic video {i}",
+                "description": "x" * rng.randint(200, 1500),
+                "tags": ["".join(t) for t in rng.sample(tag_pool, 8)],
+                "channelId": "".join(channel),
+                "channelTitle": "".join(f"Channel {channel[-4:]}"),
+                "publishedAt": "2025-08-10T12:00:00Z",
+                "defaultLanguage": "".join("en"),
+            },
+            "statistics": {"viewCount": str(rng.randint(0, 10**7))},
+            "contentDetails": {"duration": f"PT{rng.randint(0, 59)}M{rng.randint(0, 59)}S"},
+        }
+
+    def measure(build):
+        tracemalloc.start()
+        held = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del held
+        return current
+
+    def build_dicts():
+        held = []
+        for i in range(n):
+            item = make_item(i)
+            snippet = item["snippet"]
+            held.append({
+                "title": snippet["title"],
+                "description": snippet["description"],
+                "tags": snippet["tags"],
+                "video_url": f"https://www.youtube.com/watch?v={item['id']}",
+                "video_id": item["id"],
+                "channel_title": snippet["channelTitle"],
+                "channel_id": snippet["channelId"],
+                "subscriber_count": "1000",
+                "view_count": item["statistics"]["viewCount"],
+                "duration_minutes": int(isodate.parse_duration(item["contentDetails"]["duration"]).total_seconds()) // 60,
+                "published_at": snippet["publishedAt"][:10],
+                "keyword": "".join("benchmark"),
+            })
+        return held
+
+    def build_records():
+        held = []
+        for i in range(n):
+            record = VideoRecord.from_api(make_item(i))
+            record.subscriber_count = 1000
+            record.keyword = _intern("".join("benchmark"))
+            held.append(record)
+        return held
+
+    rng.seed(0)
+    dict_bytes = measure(build_dicts)
+    rng.seed(0)
+    record_bytes = measure(build_records)
+    return dict_bytes, record_bytes
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    dict_bytes, record_bytes = benchmark_memory(count)
+    print(f"{count} videos")
+    print(f"result dicts: {dict_bytes / 2**20:8.1f} MiB")
+    print(f"VideoRecord:  {record_bytes / 2**20:8.1f} MiB")
+    print(f"saved:        {(1 - record_bytes / dict_bytes) * 100:8.1f} %")
@@ -0,0 +1,238 @@
+import csv
+import os
+import re
+import shutil
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+
+DEFAULT_SEEN_DIR = "data/seen"
+LEGACY_SEEN_FILE = "data/seen_history.csv"
+COMPACTED_LIST = "compacted.txt"
+# A journal untouched this long belongs to a process that is gone; flush() folds it in
+STALE_JOURNAL_SECONDS = 24 * 3600
+
+def default_node_name():
+    return re.sub(r"[^A-Za-z0-9_.]+", "_", socket.gethostname()) or "node"
+
+class SeenStore:
+    """
+    Seen video IDs as a directory of immutable, sorted segment files.
+
+    - New IDs are appended to this process's journal (journal-<node>-<pid>.csv) as they
+      are found, so the GUI, headless runs and the daemon on one machine never share one.
+    - flush() moves the journal aside atomically, then sorts it into a new segment
+      (seg-<time>-<node>-<id>.csv). Journals left behind by processes that died are
+      folded in the same way once they go stale.
+    - Segments never change once written, so syncing machines is just copying
+      segment files that the other side does not have yet; merging is idempotent.
+    - compact() folds every segment into one and records the folded names in
+      compacted.txt so they are not imported again. export_to() carries those names
+      to the shared directory and deletes the folded segments there; import_from()
+      does the same locally for compactions made on other nodes.
+    - refresh() only reads segments it has not loaded before, plus other processes'
+      journals, which are still growing.
+    """
+
+    def __init__(self, root=DEFAULT_SEEN_DIR, node=None, legacy_file=LEGACY_SEEN_FILE):
+        self.root = root
+        self.node = node or default_node_name()
+        self.ids = set()
+        self.loaded = set()
+        self.lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self.journal_path = os.path.join(root, f"journal-{self.node}-{os.getpid()}.csv")
+        if legacy_file and os.path.exists(legacy_file):
+            self._migrate_legacy(legacy_file)
+
+    def _migrate_legacy(self, legacy_file):
+        """One-time import of the old single-file history as a segment."""
+        marker = os.path.join(self.root, "legacy.done")
+        if os.path.exists(marker):
+            return
+        rows = self._read_rows(legacy_file, {})
+        if rows:
+            self._write_segment(rows)
+        open(marker, "w").close()
+
+    def segment_names(self, root=None):
+        root = root or self.root
+        if not os.path.isdir(root):
+            return []
+        return sorted(n for n in os.listdir(root) if n.startswith("seg-") and n.endswith(".csv"))
+
+    def compacted_names(self, root=None):
+        path = os.path.join(root or self.root, COMPACTED_LIST)
+        if not os.path.exists(path):
+            return set()
+        with open(path, "r", encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def journal_names(self):
+        """Live journals plus any a flush moved aside but did not finish (.flushing)."""
+        return sorted(
+            n for n in os.listdir(self.root)
+            if n.startswith("journal-") and n.endswith((".csv", ".flushing"))
+        )
+
+    def _read_ids(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return [row[0] for row in csv.reader(f) if row]
+        except FileNotFoundError:
+            return []  # flushed by its owner in the meantime
+
+    def _read_rows(self, path, rows):
+        """Add {video_id: date} from one file into rows, keeping the first date seen."""
+        with open(path, "r", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if row:
+                    rows.setdefault(row[0], row[1] if len(row) > 1 else "")
+        return rows
+
+    def refresh(self):
+        """Load segments not seen yet and other processes' journals. Returns the ID set."""
+        with self.lock:
+            for name in self.segment_names():
+                if name not in self.loaded:
+                    self.ids.update(self._read_ids(os.path.join(self.root, name)))
+                    self.loaded.add(name)
+            own = os.path.basename(self.journal_path)
+            for name in self.journal_names():
+                if name != own:
+                    self.ids.update(self._read_ids(os.path.join(self.root, name)))
+        return self.ids
+
+    def __contains__(self, video_id):
+        return video_id in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, video_id):
+        """Record a newly seen ID in this node's journal."""
+        with self.lock:
+            if video_id in self.ids:
+                return
+            self.ids.add(video_id)
+            with open(self.journal_path, "a", encoding="utf-8", newline="") as f:
+                csv.writer(f).writerow([video_id, datetime.now().strftime("%Y-%m-%d")])
+
+    def _write_segment(self, rows, label=None):
+        """Write {video_id: date} as a new sorted segment. Returns its file name."""
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        name = f"seg-{stamp}-{label or self.node}-{uuid.uuid4().hex[:8]}.csv"
+        path = os.path.join(self.root, name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            for video_id in sorted(rows):
+                writer.writerow([video_id, rows[video_id]])
+        os.replace(tmp_path, path)
+        return name
+
+    def _claim_journals(self):
+        """Atomically move this process's journal and stale ones aside. Returns the moved paths."""
+        now = time.time()
+        claimed = []
+        for name in self.journal_names():
+            path = os.path.join(self.root, name)
+            try:
+                if path != self.journal_path and now - os.path.getmtime(path) < STALE_JOURNAL_SECONDS:
+                    continue
+                flushing = f"{path}.{uuid.uuid4().hex[:8]}.flushing"
+                # Rename, then read: an append that lands after this goes to a fresh journal
+                os.replace(path, flushing)
+            except FileNotFoundError:
+                continue  # another process claimed it first
+            claimed.append(flushing)
+        return claimed
+
+    def flush(self):
+        """Turn the journal into an immutable segment so other nodes can pick it up."""
+        with self.lock:
+            claimed = self._claim_journals()
+            if not claimed:
+                return None
+            rows = {}
+            for path in claimed:
+                self._read_rows(path, rows)
+            name = self._write_segment(rows) if rows else None
+            for path in claimed:
+                os.remove(path)
+            if name:
+                self.loaded.add(name)
+            return name
+
+    def _copy_segments(self, src, dst, skip):
+        copied = 0
+        existing = set(self.segment_names(dst)) | skip
+        for name in self.segment_names(src):
+            if name in existing:
+                continue
+            tmp_path = os.path.join(dst, name + ".tmp")
+            shutil.copyfile(os.path.join(src, name), tmp_path)
+            os.replace(tmp_path, os.path.join(dst, name))
+            copied += 1
+        return copied
+
+    def _drop_compacted(self, root, names):
+        """
+        Record names as folded in root's compacted.txt and delete those segments there.
+        Only call this once the segments that folded them are present in root.
+        """
+        listed = self.compacted_names(root)
+        new = sorted(set(names) - listed)
+        if new:
+            with open(os.path.join(root, COMPACTED_LIST), "a", encoding="utf-8") as f:
+                for name in new:
+                    f.write(name + "\n")
+        for name in set(names) & set(self.segment_names(root)):
+            try:
+                os.remove(os.path.join(root, name))
+            except FileNotFoundError:
+                pass
+        return len(new)
+
+    def import_from(self, src):
+        """
+        Copy in segments from another node or a shared directory, and drop local
+        segments that src has already compacted away. Safe to repeat.
+        """
+        src_compacted = self.compacted_names(src)
+        copied = self._copy_segments(src, self.root, self.compacted_names() | src_compacted)
+        with self.lock:
+            self._drop_compacted(self.root, src_compacted)
+        self.refresh()
+        return copied
+
+    def export_to(self, dst):
+        """
+        Publish local segments to a shared directory, then apply local compactions
+        there too, so dst keeps one merged copy instead of every folded segment.
+        Safe to repeat.
+        """
+        os.makedirs(dst, exist_ok=True)
+        self.flush()
+        copied = self._copy_segments(self.root, dst, self.compacted_names(dst))
+        with self.lock:
+            self._drop_compacted(dst, self.compacted_names())
+        return copied
+
+    def compact(self):
+        """Merge every segment into one. Returns the number of segments folded."""
+        self.flush()
+        with self.lock:
+            names = self.segment_names()
+            if len(names) < 2:
+                return 0
+            rows = {}
+            for name in names:
+                self._read_rows(os.path.join(self.root, name), rows)
+            merged = self._write_segment(rows, label="compact")
+            self.ids.update(rows)
+            self._drop_compacted(self.root, names)
+            self.loaded = {merged}
+            return len(names)
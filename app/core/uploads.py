@@ -0,0 +1,70 @@
+import csv
+import glob
+import json
+import os
+
+DEFAULT_WATCH_STATE = "data/channel_watch.json"
+# If last_seen was deleted from the channel we would never find it; give up after this many pages
+MAX_INCREMENTAL_PAGES = 10
+
+def uploads_playlist_id(channel_id):
+    """A channel's uploads playlist is its ID with the UC prefix swapped for UU."""
+    if channel_id.startswith("UC"):
+        return "UU" + channel_id[2:]
+    return None
+
+def channels_from_exports(export_dir="export"):
+    """Every channel_id that appears in the daily exports."""
+    channel_ids = set()
+    for path in sorted(glob.glob(os.path.join(export_dir, "results_*.csv"))):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                if row.get("channel_id"):
+                    channel_ids.add(row["channel_id"])
+    return channel_ids
+
+def load_watch_state(path=DEFAULT_WATCH_STATE):
+    """channel_id -> newest video ID already crawled."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_watch_state(state, path=DEFAULT_WATCH_STATE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def crawl_channel_uploads(api, channel_id, last_seen=None, max_pages=1):
+    """
+    Walk a channel's uploads playlist newest first (1 unit per page) and stop at
+    last_seen. Without a last_seen only the first max_pages pages are read so a new
+    channel does not pull its whole back catalogue.
+    Returns (new video IDs newest first, newest video ID to store as last_seen, complete).
+    complete is False when a page could not be paid for; newest is then last_seen so
+    the next crawl walks the same range again.
+    """
+    playlist_id = uploads_playlist_id(channel_id)
+    if not playlist_id:
+        return [], last_seen, True
+    new_ids = []
+    page_token = None
+    pages = 0
+    while True:
+        quota_before = api.quota_used
+        video_ids, page_token = api.get_playlist_items_page(playlist_id, page_token=page_token)
+        if api.quota_used == quota_before:
+            # No key could pay for this page: uploads past it are still unknown
+            return new_ids, last_seen, False
+        pages += 1
+        if last_seen in video_ids:
+            new_ids.extend(video_ids[:video_ids.index(last_seen)])
+            break
+        new_ids.extend(video_ids)
+        limit = max_pages if last_seen is None else MAX_INCREMENTAL_PAGES
+        if not page_token or pages >= limit:
+            break
+    newest = new_ids[0] if new_ids else last_seen
+    return new_ids, newest, True
@@ -0,0 +1,119 @@
+import csv
+import glob
+import os
+import time
+from datetime import datetime
+
+from core.cassette import CassetteMissError
+from core.seen_store import SeenStore
+
+BATCH_SIZE = 50
+
+def tracked_video_ids(seen_store=None, export_dir="export"):
+    """All video IDs we have ever kept: seen history plus every daily export."""
+    ids = set((seen_store or SeenStore()).refresh())
+    for path in sorted(glob.glob(os.path.join(export_dir, "results_*.csv"))):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                if row.get("video_id"):
+                    ids.add(row["video_id"])
+    return ids
+
+def last_snapshot_times(snapshot_file="data/view_snapshots.csv"):
+    """video_id -> unix timestamp of its most recent snapshot."""
+    latest = {}
+    if not os.path.exists(snapshot_file):
+        return latest
+    with open(snapshot_file, "r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if len(row) >= 2:
+                latest[row[0]] = max(int(row[1]), latest.get(row[0], 0))
+    return latest
+
+def refresh_statistics(api, video_ids, snapshot_file="data/view_snapshots.csv"):
+    """
+    Re-fetch statistics in full 50-ID batches (1 quota unit each) and append one
+    snapshot row per video: video_id, unix timestamp, views, likes, comments.
+    Videos never snapshotted go first, then the longest unrefreshed, so when the
+    budget runs out before the list does the next run picks up where this one stopped.
+    A failed batch is reported and skipped so the rest still gets refreshed.
+    Returns (snapshots written, batches failed).
+    """
+    os.makedirs(os.path.dirname(snapshot_file), exist_ok=True)
+    last = last_snapshot_times(snapshot_file)
+    video_ids = sorted(video_ids, key=lambda vid: (last.get(vid, 0), vid))
+    written = 0
+    failed = 0
+    with open(snapshot_file, "a", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        for i in range(0, len(video_ids), BATCH_SIZE):
+            if not api.can_afford(api.VIDEOS_LIST_COST):
+                break
+            try:
+                items = api.get_videos_statistics(video_ids[i:i + BATCH_SIZE])
+            except CassetteMissError:
+                raise
+            except Exception as e:
+                print(f"Statistics error for videos {i + 1}-{min(i + BATCH_SIZE, len(video_ids))}: {e}")
+                failed += 1
+                continue
+            ts = int(time.time())
+            for item in items:
+                stats = item.get("statistics", {})
+                writer.writerow([
+                    item["id"],
+                    ts,
+                    int(stats.get("viewCount", 0)),
+                    int(stats.get("likeCount", 0)),
+                    int(stats.get("commentCount", 0)),
+                ])
+                written += 1
+    return written, failed
+
+def compute_velocity(snapshot_file="data/view_snapshots.csv"):
+    """
+    Views/hour per video between its two most recent snapshots.
+    Streams the snapshot file keeping only the last two rows per video.
+    Returns dicts sorted by views_per_hour, fastest growing first.
+    """
+    if not os.path.exists(snapshot_file):
+        return []
+    latest = {}
+    with open(snapshot_file, "r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if len(row) < 3:
+                continue
+            snap = (int(row[1]), int(row[2]))
+            prev = latest.get(row[0])
+            latest[row[0]] = (prev[1] if prev else None, snap)
+
+    ranked = []
+    for video_id, (older, newer) in latest.items():
+        velocity = None
+        if older and newer[0] > older[0]:
+            velocity = (newer[1] - older[1]) * 3600 / (newer[0] - older[0])
+        ranked.append({
+            "video_id": video_id,
+            "view_count": newer[1],
+            "views_per_hour": round(velocity, 2) if velocity is not None else None,
+            "last_refreshed": datetime.fromtimestamp(newer[0]).isoformat(timespec="seconds"),
+        })
+    ranked.sort(key=lambda r: (r["views_per_hour"] is not None, r["views_per_hour"] or 0), reverse=True)
+    return ranked
+
+def save_velocity_csv(ranked, out_dir="export"):
+    """Save the growth ranking to export/velocity_<date>.csv and return its path."""
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    filename = os.path.join(out_dir, f"velocity_{date_str}.csv")
+    os.makedirs(out_dir, exist_ok=True)
+    fieldnames = ["video_id", "video_url", "view_count", "views_per_hour", "last_refreshed"]
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for r in ranked:
+            writer.writerow({
+                **r,
+                "video_url": f"https://www.youtube.com/watch?v={r['video_id']}",
+                "views_per_hour": "" if r["views_per_hour"] is None else r["views_per_hour"],
+            })
+    return filename
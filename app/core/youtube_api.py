@@ -1,18 +1,62 @@
 import os
+import json
 import requests
 from typing import List, Dict
 
+from core.quota_manager import KeyPool, is_quota_exceeded
+from core.cassette import cassette_from_env
+
 class YouTubeAPI:
     SEARCH_LIST_COST = 100
     VIDEOS_LIST_COST = 1
     CHANNELS_LIST_COST = 1
+    PLAYLIST_ITEMS_LIST_COST = 1
+    BASE_URL = "https://www.googleapis.com/youtube/v3"
+
+    # Partial-response projections: only what filters, dedup and export read.
+    # Extend these when a consumer starts using a new field.
+    SEARCH_FIELDS = "items/id/videoId,nextPageToken"
+    VIDEO_FIELDS = (
+        "items(id,"
+        "snippet(title,description,tags,channelId,channelTitle,publishedAt,defaultLanguage),"
+        "statistics(viewCount),"
+        "contentDetails(duration))"
+    )
+    VIDEO_STATISTICS_FIELDS = "items(id,statistics(viewCount,likeCount,commentCount))"
+    CHANNEL_FIELDS = "items(id,statistics(subscriberCount,hiddenSubscriberCount))"
+    PLAYLIST_ITEMS_FIELDS = "items/contentDetails/videoId,nextPageToken"
+    # Google APIs only gzip responses when the User-Agent also mentions gzip
+    HEADERS = {"Accept-Encoding": "gzip", "User-Agent": "youtube-finder (gzip)"}
 
-    def __init__(self, api_key=None, quota_cap=9500):
-        self.api_key = api_key or os.environ.get("YOUTUBE_API_KEY")
-        if not self.api_key:
+    def __init__(self, api_key=None, quota_cap=9500, api_keys=None, base_url=None, session=None,
+                 cassette=None):
+        """
+        api_key: single key (falls back to YOUTUBE_API_KEY / YOUTUBE_API_KEYS env vars).
+        api_keys: list of keys or {"key", "cap"} dicts; each gets its own quota_cap.
+        base_url: API root, override to point at a local fake endpoint.
+        session: requests.Session to reuse; keeps HTTP connections alive between calls.
+        cassette: core.cassette.Cassette to record responses to or replay them from
+            (defaults to YOUTUBE_API_CASSETTE). Replay never touches the network and
+            needs no real key; quota is still counted so runs behave the same.
+        """
+        self.cassette = cassette if cassette is not None else cassette_from_env()
+        if api_keys:
+            self.key_pool = KeyPool(api_keys, cap=quota_cap)
+        elif api_key:
+            self.key_pool = KeyPool([api_key], cap=quota_cap)
+        else:
+            self.key_pool = KeyPool.from_env(cap=quota_cap)
+        if not self.key_pool and self.cassette and self.cassette.replaying:
+            self.key_pool = KeyPool(["replay"], cap=quota_cap)
+        if not self.key_pool:
             raise ValueError("YOUTUBE_API_KEY environment variable not set")
-        self.quota_cap = quota_cap
+        self.api_key = self.key_pool.keys[0].key
+        self.quota_cap = self.key_pool.cap
         self.quota_used = 0
+        self.base_url = (base_url or os.environ.get("YOUTUBE_API_BASE_URL") or self.BASE_URL).rstrip("/")
+        self.session = session or requests.Session()
+        self.session.headers.update(self.HEADERS)
+        self.reset_transfer_stats()
 
     def estimate_run_cost(self, keywords, pages_per_keyword=1):
         """Estimate quota cost for a search operation"""
@@ -22,58 +66,141 @@ class YouTubeAPI:
         return search_cost + details_cost
 
     def can_afford(self, cost):
-        return (self.quota_used + cost) <= self.quota_cap
+        return self.key_pool.acquire(cost) is not None
+
+    def _get(self, endpoint, params, cost):
+        """
+        GET an endpoint on the key with the most budget left. A key that answers
+        quotaExceeded is retired and the request retried on the next one.
+        Returns parsed JSON, or None when no key can pay for the call.
+        """
+        url = f"{self.base_url}/{endpoint}"
+        while True:
+            api_key = self.key_pool.acquire(cost)
+            if api_key is None:
+                return None
+            if self.cassette and self.cassette.replaying:
+                body = self.cassette.play(endpoint, params)
+                self.key_pool.charge(api_key, cost)
+                self.quota_used += cost
+                return json.loads(body)
+            resp = self.session.get(url, params={**params, "key": api_key.key})
+            if is_quota_exceeded(resp):
+                self.key_pool.retire(api_key)
+                continue
+            self.key_pool.charge(api_key, cost)
+            self.quota_used += cost
+            self._record_transfer(resp)
+            resp.raise_for_status()
+            if self.cassette:
+                self.cassette.record(endpoint, params, resp.content)
+            return resp.json()
+
+    def _record_transfer(self, resp):
+        decoded = len(resp.content)
+        try:
+            wire = int(resp.headers.get("Content-Length") or 0) or resp.raw.tell()
+        except (AttributeError, ValueError):
+            wire = decoded
+        self.transfer["requests"] += 1
+        self.transfer["bytes_on_wire"] += wire or decoded
+        self.transfer["bytes_decoded"] += decoded
+
+    def reset_transfer_stats(self):
+        self.transfer = {"requests": 0, "bytes_on_wire": 0, "bytes_decoded": 0}
+
+    def transfer_stats(self):
+        """Bytes moved since the last reset; bytes_saved is what gzip kept off the wire."""
+        stats = dict(self.transfer)
+        stats["bytes_saved"] = max(stats["bytes_decoded"] - stats["bytes_on_wire"], 0)
+        return stats
+
+    def key_usage(self):
+        """Per-key quota spend for this run."""
+        return self.key_pool.usage()
+
+    def key_ledger(self):
+        """Per-key spend to save in a checkpoint (keys are fingerprinted, not stored)."""
+        return self.key_pool.ledger()
+
+    def seed_quota(self, ledger=None, total=0):
+        """Carry spend over from an interrupted run so a resumed run keeps to the same cap."""
+        self.quota_used += self.key_pool.seed(ledger, total)
 
     def search_videos(self, query, **params) -> List[Dict]:
         """Search videos by keyword/phrase. Returns list of video IDs."""
-        if not self.can_afford(self.SEARCH_LIST_COST):
-            return []
-        url = "https://www.googleapis.com/youtube/v3/search"
+        video_ids, _ = self.search_videos_page(query, **params)
+        return video_ids
+
+    def search_videos_page(self, query, page_token=None, **params):
+        """Search one results page. Returns (video IDs, nextPageToken or None)."""
         req_params = {
-            "part": "snippet",
+            "part": "id",
+            "fields": self.SEARCH_FIELDS,
             "type": "video",
             "maxResults": 50,
             "q": query,
-            "key": self.api_key,
             **params
         }
-        resp = requests.get(url, params=req_params)
-        self.quota_used += self.SEARCH_LIST_COST
-        resp.raise_for_status()
-        items = resp.json().get("items", [])
-        return [item["id"]["videoId"] for item in items if "videoId" in item["id"]]
+        if page_token:
+            req_params["pageToken"] = page_token
+        data = self._get("search", req_params, self.SEARCH_LIST_COST)
+        if data is None:
+            return [], None
+        items = data.get("items", [])
+        video_ids = [item["id"]["videoId"] for item in items if "videoId" in item["id"]]
+        return video_ids, data.get("nextPageToken")
 
     def get_videos_details(self, video_ids: List[str]) -> List[Dict]:
         """Fetch metadata for a list of video IDs."""
-        if not self.can_afford(self.VIDEOS_LIST_COST):
-            return []
-        url = "https://www.googleapis.com/youtube/v3/videos"
-        ids = ",".join(video_ids)
         params = {
             "part": "snippet,statistics,contentDetails",
-            "id": ids,
-            "key": self.api_key
+            "fields": self.VIDEO_FIELDS,
+            "id": ",".join(video_ids),
         }
-        resp = requests.get(url, params=params)
-        self.quota_used += self.VIDEOS_LIST_COST
-        resp.raise_for_status()
-        return resp.json().get("items", [])
+        data = self._get("videos", params, self.VIDEOS_LIST_COST)
+        return data.get("items", []) if data else []
+
+    def get_videos_statistics(self, video_ids: List[str]) -> List[Dict]:
+        """Fetch only statistics for up to 50 video IDs (1 unit, smallest payload)."""
+        params = {
+            "part": "statistics",
+            "fields": self.VIDEO_STATISTICS_FIELDS,
+            "id": ",".join(video_ids),
+        }
+        data = self._get("videos", params, self.VIDEOS_LIST_COST)
+        return data.get("items", []) if data else []
 
     def get_channels_details(self, channel_ids: List[str]) -> List[Dict]:
         """Fetch subscriber count and hidden status for channel IDs."""
-        if not self.can_afford(self.CHANNELS_LIST_COST):
-            return []
-        url = "https://www.googleapis.com/youtube/v3/channels"
-        ids = ",".join(channel_ids)
         params = {
             "part": "statistics",
-            "id": ids,
-            "key": self.api_key
+            "fields": self.CHANNEL_FIELDS,
+            "id": ",".join(channel_ids),
         }
-        resp = requests.get(url, params=params)
-        self.quota_used += self.CHANNELS_LIST_COST
-        resp.raise_for_status()
-        return resp.json().get("items", [])
+        data = self._get("channels", params, self.CHANNELS_LIST_COST)
+        return data.get("items", []) if data else []
+
+    def get_playlist_items_page(self, playlist_id, page_token=None):
+        """One page (up to 50) of video IDs from a playlist. Returns (video IDs, nextPageToken or None)."""
+        params = {
+            "part": "contentDetails",
+            "fields": self.PLAYLIST_ITEMS_FIELDS,
+            "playlistId": playlist_id,
+            "maxResults": 50,
+        }
+        if page_token:
+            params["pageToken"] = page_token
+        data = self._get("playlistItems", params, self.PLAYLIST_ITEMS_LIST_COST)
+        if data is None:
+            return [], None
+        items = data.get("items", [])
+        video_ids = [item["contentDetails"]["videoId"] for item in items if "contentDetails" in item]
+        return video_ids, data.get("nextPageToken")
 
     def reset_quota(self):
-        self.quota_used = 0
\ No newline at end of file
+        self.quota_used = 0
+        for api_key in self.key_pool.keys:
+            api_key.used = 0
+            api_key.calls = 0
+            api_key.retired = False
@@ -3,12 +3,15 @@ import customtkinter as ctk
 from tkinter import messagebox
 from core.youtube_api import YouTubeAPI
 from core.filters import filter_videos
+from core.records import VideoRecord, ChannelRecord
 from core.csv_utils import (
     save_results_csv,
-    read_seen_history,
-    append_seen_history,
     log_run
 )
+from core.dedup import NearDuplicateIndex, collapse_near_duplicates
+from core.seen_store import SeenStore
+from ui.thumbnails import ThumbnailLoader, THUMBNAIL_SIZE
+from ui.channel_panel import TopChannelsWindow
 import os
 
 class YouTubeFinderApp(ctk.CTk):
@@ -21,7 +24,14 @@ class YouTubeFinderApp(ctk.CTk):
         self.channel_id_map = {}  # Dictionary to store channel name to ID mapping
 
         # Initialize column widths
-        self.col_widths = [300, 150, 80, 80, 80, 100, 120, 60]
+        self.col_widths = [THUMBNAIL_SIZE[0], 300, 150, 80, 80, 80, 100, 120, 60]
+
+        # Thumbnail state: rows with a video, rows currently showing an image
+        self.thumbnails = ThumbnailLoader(self)
+        self.table_rows = []
+        self.visible_thumbs = set()
+        self._thumb_update_pending = None
+        self.channels_window = None
 
         self.grid_columnconfigure(0, weight=0)
         self.grid_columnconfigure(1, weight=1)
@@ -35,6 +45,7 @@ class YouTubeFinderApp(ctk.CTk):
         self.api = YouTubeAPI()
         self.start_button.configure(command=self.on_start_now)
         self.schedule_button.configure(command=self.on_save_schedule)
+        self.channels_button.configure(command=self.on_top_channels)
         
         # Initialize data structures
         self.df = pd.DataFrame()
@@ -55,12 +66,19 @@ class YouTubeFinderApp(ctk.CTk):
             "language": self.lang_var.get(),
             "pages_per_keyword": self._parse_int(self.pages_entry.get()) or 1,
             "skip_hidden_subs": self.skip_hidden_var.get(),
-            "fresh_search": self.fresh_search_var.get()
+            "fresh_search": self.fresh_search_var.get(),
+            "collapse_duplicates": self.collapse_dups_var.get()
         }
 
+        # Merge into the existing file so settings not edited here (api_keys,
+        # watch_channels, channel_score, ...) survive a save from the GUI
+        import json
+        if os.path.exists("settings.json"):
+            with open("settings.json", "r", encoding="utf-8") as f:
+                settings = {**json.load(f), **settings}
+
         # Save settings to JSON
         with open("settings.json", "w", encoding="utf-8") as f:
-            import json
             json.dump(settings, f, indent=2)
 
         # Create batch file for scheduling
@@ -82,6 +100,23 @@ python app/scheduler/headless.py --settings settings.json
             "d) Action: Start 'youtube_finder_task.bat'"
         )
 
+    def on_top_channels(self):
+        """Open (or raise) the top channels panel"""
+        if self.channels_window is not None and self.channels_window.winfo_exists():
+            self.channels_window.refresh()
+            self.channels_window.focus()
+            return
+        settings = {}
+        if os.path.exists("settings.json"):
+            with open("settings.json", "r", encoding="utf-8") as f:
+                import json
+                settings = json.load(f)
+        self.channels_window = TopChannelsWindow(
+            self,
+            score=settings.get("channel_score", "views"),
+            weights=settings.get("channel_score_weights")
+        )
+
     def on_start_now(self):
         """Execute search with current parameters"""
         keywords = [kw.strip() for kw in self.keywords_text.get("1.0", "end").splitlines() if kw.strip()]
@@ -109,14 +144,13 @@ python app/scheduler/headless.py --settings settings.json
             self.progress_bar.configure(mode="determinate")
             return
 
-        # Check seen history
-        seen_history_path = "data/seen_history.csv"
-        if filters['fresh_search'] and os.path.exists(seen_history_path):
-            os.remove(seen_history_path)
-        seen_ids = read_seen_history(seen_history_path)
+        # Check seen history (fresh search ignores it for dedup but still records new finds)
+        seen_store = SeenStore()
+        seen_ids = set() if filters['fresh_search'] else seen_store.refresh()
 
         all_results = []
         found_any = False
+        dup_index = NearDuplicateIndex() if filters['collapse_duplicates'] else None
         quota_estimate = self.api.estimate_run_cost(keywords, filters['pages_per_keyword'])
         self.quota_label.configure(text=f"Estimated quota: {quota_estimate}")
 
@@ -137,18 +171,12 @@ python app/scheduler/headless.py --settings settings.json
                     continue
 
                 # Get video details
-                details = self.api.get_videos_details(video_ids[:50])
-                channel_ids = [item["snippet"]["channelId"] for item in details if "snippet" in item]
+                details = [VideoRecord.from_api(item) for item in self.api.get_videos_details(video_ids[:50])]
+                channel_ids = list(dict.fromkeys(v.channel_id for v in details if v.channel_id))
                 channel_details = self.api.get_channels_details(channel_ids)
 
                 # Build channel info
-                chinfo = {
-                    item["id"]: {
-                        "subscriberCount": item["statistics"].get("subscriberCount", "0"),
-                        "hiddenSubscriberCount": item["statistics"].get("hiddenSubscriberCount", False),
-                    }
-                    for item in channel_details
-                }
+                chinfo = {c.channel_id: c for c in map(ChannelRecord.from_api, channel_details)}
 
                 # Filter videos
                 filtered = filter_videos(
@@ -170,19 +198,22 @@ python app/scheduler/headless.py --settings settings.json
                     continue
 
                 # Process filtered results
-                for item in filtered:
-                    result = self._process_video_item(item, keyword, chinfo)
+                results = [self._process_video_item(item, keyword, chinfo) for item in filtered]
+                for result in results:
+                    seen_store.add(result.video_id)
+                if dup_index is not None:
+                    results = collapse_near_duplicates(results, dup_index)
+                for result in results:
                     all_results.append(result)
                     self._add_table_row([
-                        result['title'],
-                        result['channel_title'],
-                        self._format_number(result['view_count']),
-                        self._format_number(result['subscriber_count']),
-                        self._human_duration(result['duration_minutes'] * 60),
-                        result['published_at'],
+                        result.title,
+                        result.channel_title,
+                        self._format_number(result.view_count),
+                        self._format_number("-" if result.subscriber_count is None else result.subscriber_count),
+                        self._human_duration(result.duration_seconds),
+                        result.published_at,
                         keyword
-                    ], video_id=result['video_id'])
-                    append_seen_history(result['video_id'], out_file=seen_history_path)
+                    ], video_id=result.video_id)
                     found_any = True
 
             except Exception as e:
@@ -190,6 +221,9 @@ python app/scheduler/headless.py --settings settings.json
                 continue
 
         # Finalize
+        seen_store.flush()
+        if dup_index is not None:
+            dup_index.close()
         self.progress_bar.stop()
         self.progress_bar.configure(mode="determinate")
         
@@ -250,40 +284,19 @@ python app/scheduler/headless.py --settings settings.json
             'language': self.lang_var.get() if self.lang_var.get() else None,
             'skip_hidden_subs': self.skip_hidden_var.get(),
             'fresh_search': self.fresh_search_var.get(),
+            'collapse_duplicates': self.collapse_dups_var.get(),
             'pages_per_keyword': self._parse_int(self.pages_entry.get()) or 1
         }
 
     def _process_video_item(self, item, keyword, chinfo):
-        """Extract relevant data from video item"""
-        snippet = item["snippet"]
-        stats = item["statistics"]
-        content = item["contentDetails"]
-        channel_id = snippet["channelId"]
-        
-        duration_seconds = 0
-        try:
-            import isodate
-            duration_seconds = int(isodate.parse_duration(content["duration"]).total_seconds())
-        except Exception:
-            pass
+        """Fill in pipeline fields on a filtered VideoRecord"""
+        channel = chinfo.get(item.channel_id)
+        item.subscriber_count = channel.subscriber_count if channel else None
+        item.keyword = keyword
 
         # Update channel_id_map with the channel title and ID
-        self.channel_id_map[snippet["channelTitle"]] = channel_id
-
-        return {
-            "title": snippet["title"],
-            "description": snippet["description"],
-            "tags": snippet.get("tags", []),
-            "video_url": f"https://www.youtube.com/watch?v={item['id']}",
-            "video_id": item["id"],
-            "channel_title": snippet["channelTitle"],
-            "channel_id": channel_id,
-            "subscriber_count": chinfo.get(channel_id, {}).get("subscriberCount", "0"),
-            "view_count": stats.get("viewCount", "0"),
-            "duration_minutes": duration_seconds // 60,
-            "published_at": snippet["publishedAt"][:10],
-            "keyword": keyword,
-        }
+        self.channel_id_map[item.channel_title] = item.channel_id
+        return item
 
     def _create_sidebar(self):
         """Create the left sidebar with controls"""
@@ -371,14 +384,20 @@ python app/scheduler/headless.py --settings settings.json
         ctk.CTkCheckBox(self.sidebar, text="Skip hidden subs", variable=self.skip_hidden_var).pack(anchor="w", padx=12)
         
         self.fresh_search_var = ctk.BooleanVar(value=False)
-        ctk.CTkCheckBox(self.sidebar, text="Fresh search (clear history)", variable=self.fresh_search_var).pack(anchor="w", padx=12, pady=(0, 10))
+        ctk.CTkCheckBox(self.sidebar, text="Fresh search (ignore history)", variable=self.fresh_search_var).pack(anchor="w", padx=12)
+
+        self.collapse_dups_var = ctk.BooleanVar(value=True)
+        ctk.CTkCheckBox(self.sidebar, text="Collapse re-uploads/variants", variable=self.collapse_dups_var).pack(anchor="w", padx=12, pady=(0, 10))
 
         # 9. Buttons
         self.start_button = ctk.CTkButton(self.sidebar, text="Start Now", width=200)
         self.start_button.pack(pady=(12, 6))
         
         self.schedule_button = ctk.CTkButton(self.sidebar, text="Save Schedule...", width=200)
-        self.schedule_button.pack(pady=(0, 16))
+        self.schedule_button.pack(pady=(0, 6))
+
+        self.channels_button = ctk.CTkButton(self.sidebar, text="Top Channels...", width=200)
+        self.channels_button.pack(pady=(0, 16))
 
     def _create_main_area(self):
         """Create the main results area"""
@@ -439,17 +458,28 @@ python app/scheduler/headless.py --settings settings.json
         self.table_frame.grid(row=2, column=0, sticky="nsew", padx=10, pady=10)
         self._render_table_header()
 
+        # Re-check which rows need thumbnails whenever the view moves
+        canvas = self.table_frame._parent_canvas
+        scrollbar = self.table_frame._scrollbar
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            self._schedule_thumbnail_update()
+        canvas.configure(yscrollcommand=on_scroll)
+        canvas.bind("<Configure>", lambda e: self._schedule_thumbnail_update(), add="+")
+
+    # Table layout: thumbnail, 7 text columns, actions
+    TABLE_HEADERS = ["", "Title", "Channel", "Views", "Subs", "Duration", "Published", "Keyword", "Actions"]
+    TABLE_WEIGHTS = [0, 3, 2, 1, 1, 1, 1, 2, 1]
+    THUMB_COLUMN = 0
+    ACTIONS_COLUMN = 8
+
     def _render_table_header(self):
         """Render the table header row with dynamic column widths"""
         header_frame = ctk.CTkFrame(self.table_frame)
         header_frame.pack(fill="x")
 
-        # Define column headers and their relative weights
-        headers = ["Title", "Channel", "Views", "Subs", "Duration", "Published", "Keyword", "Actions"]
-        weights = [3, 2, 1, 1, 1, 1, 2, 1]  # Proportional weights for each column
-
         bold = ctk.CTkFont(size=13, weight="bold")
-        for idx, (text, weight) in enumerate(zip(headers, weights)):
+        for idx, (text, weight) in enumerate(zip(self.TABLE_HEADERS, self.TABLE_WEIGHTS)):
             label = ctk.CTkLabel(
                 header_frame,
                 text=text,
@@ -457,18 +487,21 @@ python app/scheduler/headless.py --settings settings.json
                 anchor="w"
             )
             label.grid(row=0, column=idx, padx=2, sticky="ew")
-            header_frame.grid_columnconfigure(idx, weight=weight, minsize=80)  # Minimum width of 80 pixels
+            minsize = THUMBNAIL_SIZE[0] if idx == self.THUMB_COLUMN else 80  # Minimum width of 80 pixels
+            header_frame.grid_columnconfigure(idx, weight=weight, minsize=minsize)
 
     def _add_table_row(self, values, video_id=None):
         """Add a row to the results table with dynamic text handling"""
         row_frame = ctk.CTkFrame(self.table_frame)
         row_frame.pack(fill="x", pady=1)
 
-        headers = ["Title", "Channel", "Views", "Subs", "Duration", "Published", "Keyword", "Actions"]
-        weights = [3, 2, 1, 1, 1, 1, 2, 1]  # Same weights as header
+        # Thumbnail placeholder; the image is loaded only while the row is on screen
+        thumb_label = ctk.CTkLabel(row_frame, text="", width=THUMBNAIL_SIZE[0], height=THUMBNAIL_SIZE[1])
+        thumb_label.grid(row=0, column=self.THUMB_COLUMN, padx=2, sticky="w")
+        row_frame.grid_columnconfigure(self.THUMB_COLUMN, weight=0, minsize=THUMBNAIL_SIZE[0])
 
-        for idx, (val, weight) in enumerate(zip(values, weights)):
-            if headers[idx] in ["Title", "Channel"] and len(str(val)) > 50:
+        for idx, val in enumerate(values, start=1):
+            if self.TABLE_HEADERS[idx] in ["Title", "Channel"] and len(str(val)) > 50:
                 val = str(val)[:47] + "..."
             label = ctk.CTkLabel(
                 row_frame,
@@ -476,11 +509,12 @@ python app/scheduler/headless.py --settings settings.json
                 anchor="w"
             )
             label.grid(row=0, column=idx, padx=2, sticky="w")
-            row_frame.grid_columnconfigure(idx, weight=weight, minsize=80)
+            row_frame.grid_columnconfigure(idx, weight=self.TABLE_WEIGHTS[idx], minsize=80)
 
         if video_id:
+            self.table_rows.append((row_frame, thumb_label, video_id))
             btn_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
-            btn_frame.grid(row=0, column=7, padx=2, sticky="e")  # Align with "Actions" column
+            btn_frame.grid(row=0, column=self.ACTIONS_COLUMN, padx=2, sticky="e")  # Align with "Actions" column
 
             # Video button
             ctk.CTkButton(
@@ -503,15 +537,49 @@ python app/scheduler/headless.py --settings settings.json
             ).grid(row=0, column=1, padx=2, pady=2)
 
             # Ensure btn_frame takes up the full "Actions" column space
-            row_frame.grid_columnconfigure(7, weight=1)
+            row_frame.grid_columnconfigure(self.ACTIONS_COLUMN, weight=1)
+            self._schedule_thumbnail_update()
 
     def _clear_table(self, keep_header=False):
         """Clear the results table"""
+        self.thumbnails.clear()
+        self.table_rows = []
+        self.visible_thumbs = set()
         for widget in self.table_frame.winfo_children():
             widget.destroy()
         if keep_header:
             self._render_table_header()
 
+    def _schedule_thumbnail_update(self):
+        """Coalesce scroll/resize/row events into one visibility pass"""
+        if self._thumb_update_pending is None:
+            self._thumb_update_pending = self.after(100, self._update_visible_thumbnails)
+
+    def _update_visible_thumbnails(self):
+        """Request thumbnails for rows in (or near) the viewport and drop the rest"""
+        self._thumb_update_pending = None
+        if not self.table_rows:
+            return
+        canvas = self.table_frame._parent_canvas
+        inner_height = max(self.table_frame.winfo_height(), 1)
+        top_frac, bottom_frac = canvas.yview()
+        margin = canvas.winfo_height()  # preload one screen above and below
+        top = top_frac * inner_height - margin
+        bottom = bottom_frac * inner_height + margin
+
+        visible = set()
+        for row_frame, thumb_label, video_id in self.table_rows:
+            if not row_frame.winfo_ismapped():
+                continue
+            y = row_frame.winfo_y()
+            if y + row_frame.winfo_height() >= top and y <= bottom:
+                visible.add(video_id)
+                if video_id not in self.visible_thumbs:
+                    self.thumbnails.request(video_id, thumb_label)
+        for video_id in self.visible_thumbs - visible:
+            self.thumbnails.release(video_id)
+        self.visible_thumbs = visible
+
     def _apply_table_filter(self, *args):
         """Apply filter to the results table"""
         filter_text = self.filter_var.get().lower()
@@ -524,7 +592,7 @@ python app/scheduler/headless.py --settings settings.json
             if isinstance(widget, ctk.CTkFrame) and widget != header:
                 # Check each column's text for filter match
                 match_found = False
-                for i in range(7):  # Check all columns except actions
+                for i in range(1, self.ACTIONS_COLUMN):  # Check all text columns
                     try:
                         label = widget.grid_slaves(row=0, column=i)
                         if label and filter_text in label[0].cget("text").lower():
@@ -538,6 +606,7 @@ python app/scheduler/headless.py --settings settings.json
                     widget.pack(fill="x", pady=1)
                 else:
                     widget.pack_forget()
+        self._schedule_thumbnail_update()
 
     def _update_quota_estimate(self):
         """Update the estimated quota usage display"""
@@ -604,7 +673,10 @@ python app/scheduler/headless.py --settings settings.json
 def main():
     """Main application entry point"""
     app = YouTubeFinderApp()
-    app.mainloop()
+    try:
+        app.mainloop()
+    finally:
+        app.thumbnails.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
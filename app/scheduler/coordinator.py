@@ -0,0 +1,97 @@
+import sys
+import os
+import time
+import argparse
+import subprocess
+# Add app/ to sys.path for core/ imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.job_queue import JobQueue, DEFAULT_QUEUE
+from core.records import VideoRecord
+from core.csv_utils import save_results_csv, log_run
+from scheduler.headless import load_settings
+
+def collect(queue, run_id):
+    """Export a finished run's results once and log it. Returns True if this call exported it."""
+    if not queue.is_finished(run_id):
+        return False
+    if not queue.mark_exported(run_id):
+        return False
+    settings = queue.run_settings(run_id)
+    keywords = settings.get("keywords", [])
+    records = [VideoRecord.from_dict(d) for d in queue.results(run_id)]
+    status = queue.status(run_id)
+    if records:
+        save_results_csv(records, keyword=";".join(keywords))
+    failed = status["tasks"].get("failed", 0)
+    log_run(
+        keywords_count=len(keywords),
+        results_count=len(records),
+        quota_used=status["quota_used"],
+        error=f"{failed} tasks failed" if failed else None
+    )
+    print(f"Run {run_id}: saved {len(records)} results, quota {status['quota_used']}/{status['quota_cap']}.")
+    return True
+
+def print_status(queue, run_id):
+    status = queue.status(run_id)
+    tasks = ", ".join(f"{k}={v}" for k, v in sorted(status["tasks"].items())) or "no tasks"
+    print(f"{run_id}: {tasks}; results={status['results']}; "
+          f"quota {status['quota_used']}/{status['quota_cap']}; exported={status['exported']}")
+
+def spawn_workers(queue_path, count):
+    """Start local worker processes that exit once the queue is drained."""
+    worker = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker.py")
+    return [
+        subprocess.Popen([sys.executable, worker, "--queue", queue_path, "--exit-when-idle"])
+        for _ in range(count)
+    ]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Queue saved searches for worker processes and collect their results."
+    )
+    parser.add_argument("command", choices=["enqueue", "run", "status", "collect"],
+                        help="enqueue: queue a run; run: enqueue, start local workers, wait and collect; "
+                             "status: show runs; collect: export finished runs")
+    parser.add_argument("--settings", default="settings.json", help="Path to settings JSON")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE, help="Path to the queue database")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Local workers for 'run'")
+    args = parser.parse_args(argv)
+
+    queue = JobQueue(args.queue)
+    try:
+        if args.command in ("enqueue", "run"):
+            settings = load_settings(args.settings)
+            if settings is None:
+                print(f"ERROR: {args.settings} not found.")
+                return
+            run_id = queue.create_run(settings)
+            print(f"Queued run {run_id}: {len(settings.get('keywords', []))} keywords, "
+                  f"api_cap {settings.get('api_cap', 9500)}.")
+            if args.command == "run":
+                for proc in spawn_workers(args.queue, args.workers):
+                    proc.wait()
+                # A worker killed mid-lease leaves its task leased; wait for the lease to lapse and retry
+                while not queue.is_finished(run_id):
+                    if not queue.status(run_id)["tasks"].get("leased"):
+                        # Workers only exit with tasks pending when they handed them back for lack of quota
+                        print(f"Run {run_id} paused: API keys are out of quota. Start workers again "
+                              f"once it resets, then collect.")
+                        return
+                    for proc in spawn_workers(args.queue, 1):
+                        proc.wait()
+                    time.sleep(5)
+                collect(queue, run_id)
+        elif args.command == "status":
+            for run_id in queue.open_runs():
+                print_status(queue, run_id)
+        elif args.command == "collect":
+            for run_id in queue.open_runs():
+                if not collect(queue, run_id):
+                    print_status(queue, run_id)
+    finally:
+        queue.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import sys
+import os
+import json
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+# Add app/ to sys.path for core/ imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.quota_manager import QUOTA_TZ
+from core.seen_store import SeenStore
+from scheduler.headless import load_settings, run_search, make_api
+
+TICK_SECONDS = 30
+
+def _parse_cron_field(field, lo, hi):
+    """Expand one cron field (*, */n, a-b, a,b, a-b/n) into a set of ints."""
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step = part.split("/", 1)
+            step = int(step)
+        if part == "*":
+            start, end = lo, hi
+        elif "-" in part:
+            start, end = (int(x) for x in part.split("-", 1))
+        else:
+            start = end = int(part)
+        if start < lo or end > hi or start > end:
+            raise ValueError(f"cron field out of range: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+class CronSchedule:
+    """
+    Five-field cron expression: minute hour day-of-month month day-of-week (0=Sunday).
+    As in standard cron, when both day fields are restricted a day matches if either does.
+    """
+
+    def __init__(self, expr):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        self.minutes = _parse_cron_field(fields[0], 0, 59)
+        self.hours = _parse_cron_field(fields[1], 0, 23)
+        self.days = _parse_cron_field(fields[2], 1, 31)
+        self.months = _parse_cron_field(fields[3], 1, 12)
+        self.weekdays = {d % 7 for d in _parse_cron_field(fields[4], 0, 7)}
+        self.days_restricted = not fields[2].startswith("*")
+        self.weekdays_restricted = not fields[4].startswith("*")
+
+    def day_matches(self, dt):
+        in_days = dt.day in self.days
+        in_weekdays = (dt.isoweekday() % 7) in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return in_days or in_weekdays
+        return in_days and in_weekdays
+
+    def matches(self, dt):
+        return (
+            dt.minute in self.minutes
+            and dt.hour in self.hours
+            and dt.month in self.months
+            and self.day_matches(dt)
+        )
+
+    def next_after(self, dt):
+        """First matching minute strictly after dt (searches up to a year ahead)."""
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(366 * 24 * 60):
+            if candidate.month not in self.months or not self.day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if self.matches(candidate):
+                return candidate
+            candidate += timedelta(minutes=1)
+        raise ValueError(f"cron expression never fires: {self.expr!r}")
+
+class SpreadSchedule:
+    """
+    runs_per_day slots spaced evenly across the quota day (midnight Pacific),
+    shifted by offset so several spread jobs do not all fire on the same minute.
+    """
+
+    def __init__(self, runs_per_day, offset=timedelta(0)):
+        self.interval = timedelta(days=1) / max(int(runs_per_day), 1)
+        self.offset = offset % self.interval
+
+    def next_after(self, dt):
+        quota_now = dt.astimezone(QUOTA_TZ)
+        day_start = quota_now.replace(hour=0, minute=0, second=0, microsecond=0)
+        slot = day_start + self.offset
+        while slot <= quota_now:
+            slot += self.interval
+        return slot.astimezone(dt.tzinfo)
+
+class Job:
+    def __init__(self, name, settings_path, schedule):
+        self.name = name
+        self.settings_path = settings_path
+        self.schedule = schedule
+        self.next_run = None
+        self.running = False
+
+def load_jobs(jobs_path):
+    """
+    Read job definitions. Format:
+    {"jobs": [{"name": "music", "settings": "settings.json", "cron": "0 */6 * * *"},
+              {"name": "horror", "settings": "horror.json", "runs_per_day": 4}]}
+    """
+    with open(jobs_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    entries = config.get("jobs", [])
+    spread_count = sum(1 for e in entries if "cron" not in e)
+    spread_index = 0
+    jobs = []
+    for entry in entries:
+        if "cron" in entry:
+            schedule = CronSchedule(entry["cron"])
+        else:
+            # Stagger spread jobs evenly inside one slot interval
+            runs = max(int(entry.get("runs_per_day", 1)), 1)
+            stagger = timedelta(days=1) / runs / spread_count * spread_index
+            spread_index += 1
+            schedule = SpreadSchedule(runs, offset=stagger)
+        jobs.append(Job(entry["name"], entry.get("settings", "settings.json"), schedule))
+    return jobs
+
+class SchedulerDaemon:
+    """
+    Runs saved searches on their schedules in one long-lived process.
+    Between jobs it keeps the seen-set, YouTubeAPI clients (one per key set, each
+    with its own HTTP session) and parsed settings warm. Jobs that share an API key
+    never run at the same time; jobs on disjoint keys may run in parallel.
+    """
+
+    def __init__(self, jobs, max_workers=2, seen_store=None):
+        self.jobs = jobs
+        self.seen_store = seen_store or SeenStore()
+        self.seen_store.refresh()
+        self.apis = {}
+        self.settings_cache = {}
+        self.key_locks = {}
+        self.state_lock = threading.Lock()
+        # Jobs on disjoint keys run in parallel but append to the same export and log files
+        self.output_lock = threading.Lock()
+        self.quota_day = self._quota_day()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.stopped = threading.Event()
+
+    def _quota_day(self):
+        return datetime.now(QUOTA_TZ).date()
+
+    def _settings(self, path):
+        """Parsed settings, re-read only when the file changes."""
+        mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        cached = self.settings_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        settings = load_settings(path)
+        self.settings_cache[path] = (mtime, settings)
+        return settings
+
+    def _api(self, settings):
+        """Warm YouTubeAPI for this job's key set, shared by every job using the same keys."""
+        api_keys = settings.get("api_keys")
+        ident = json.dumps(api_keys, sort_keys=True) if api_keys else "env"
+        with self.state_lock:
+            api = self.apis.get(ident)
+            if api is None:
+                api = make_api(settings)
+                self.apis[ident] = api
+            locks = []
+            for api_key in sorted(api.key_pool.keys, key=lambda k: k.key):
+                locks.append(self.key_locks.setdefault(api_key.key, threading.Lock()))
+        return api, locks
+
+    def _run_job(self, job):
+        try:
+            settings = self._settings(job.settings_path)
+            if settings is None:
+                print(f"[{job.name}] settings not found: {job.settings_path}")
+                return
+            api, locks = self._api(settings)
+            # Locks are taken in key order so two jobs can never deadlock
+            for lock in locks:
+                lock.acquire()
+            try:
+                print(f"[{job.name}] started {datetime.now().isoformat(timespec='seconds')}")
+                checkpoint = os.path.join("data", "checkpoints", f"{job.name}.json")
+                run_search(
+                    settings,
+                    api=api,
+                    seen_store=self.seen_store,
+                    resume=True,
+                    checkpoint_path=checkpoint,
+                    output_lock=self.output_lock,
+                )
+            finally:
+                for lock in reversed(locks):
+                    lock.release()
+        except Exception as e:
+            print(f"[{job.name}] failed: {e}")
+        finally:
+            job.running = False
+
+    def _roll_quota_day(self):
+        """Quota resets at midnight Pacific: clear per-key ledgers on warm clients."""
+        today = self._quota_day()
+        if today != self.quota_day:
+            self.quota_day = today
+            with self.state_lock:
+                for api in self.apis.values():
+                    api.reset_quota()
+
+    def tick(self, now=None):
+        """Submit every job that is due and not already running."""
+        now = now or datetime.now().astimezone()
+        self._roll_quota_day()
+        for job in self.jobs:
+            if job.next_run is None:
+                job.next_run = job.schedule.next_after(now)
+            if now >= job.next_run and not job.running:
+                job.running = True
+                job.next_run = job.schedule.next_after(now)
+                self.executor.submit(self._run_job, job)
+
+    def run_forever(self):
+        for job in self.jobs:
+            job.next_run = job.schedule.next_after(datetime.now().astimezone())
+            print(f"[{job.name}] next run {job.next_run.isoformat(timespec='minutes')}")
+        try:
+            while not self.stopped.is_set():
+                self.tick()
+                self.stopped.wait(TICK_SECONDS)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.executor.shutdown(wait=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run saved YouTube Finder searches on a schedule.")
+    parser.add_argument("--jobs", default="schedule.json", help="Path to job definitions JSON")
+    parser.add_argument("--workers", type=int, default=2, help="Max jobs running at once")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.jobs):
+        print(f"ERROR: {args.jobs} not found.")
+        return
+
+    jobs = load_jobs(args.jobs)
+    if not jobs:
+        print("No jobs defined.")
+        return
+    SchedulerDaemon(jobs, max_workers=args.workers).run_forever()
+
+if __name__ == "__main__":
+    main()
@@ -1,148 +1,457 @@
 import sys
 import os
 import json
+import argparse
+import shutil
+import tempfile
+import contextlib
 # Add app/ to sys.path for core/ imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.youtube_api import YouTubeAPI
+from core.quota_manager import quota_day
 from core.filters import filter_videos
+from core.records import VideoRecord, ChannelRecord
+from core.seen_store import SeenStore, DEFAULT_SEEN_DIR, LEGACY_SEEN_FILE
 from core.csv_utils import (
     save_results_csv,
-    read_seen_history,
-    append_seen_history,
-    log_run
+    log_run,
+    log_key_usage,
+    log_transfer
+)
+from core.velocity import (
+    tracked_video_ids,
+    refresh_statistics,
+    compute_velocity,
+    save_velocity_csv
+)
+from core.uploads import (
+    DEFAULT_WATCH_STATE,
+    channels_from_exports,
+    load_watch_state,
+    save_watch_state,
+    crawl_channel_uploads
+)
+from core.dedup import DEFAULT_INDEX, NearDuplicateIndex, collapse_near_duplicates
+from core.cassette import Cassette, CassetteMissError, RECORD, REPLAY
+from core.checkpoint import (
+    DEFAULT_CHECKPOINT,
+    new_checkpoint,
+    load_checkpoint,
+    save_checkpoint,
+    clear_checkpoint,
+    restore_results,
+    append_results,
+    load_results,
+    results_path
 )
 
-def main():
-    settings_path = "settings.json"
-    if not os.path.exists(settings_path):
-        print("ERROR: settings.json not found.")
-        return
+# What a run reads before its first API call. It decides which requests are made
+# (seen IDs are never looked up, exports list the channels and videos to poll), so
+# --record keeps a copy next to the cassette and --replay starts from that copy.
+REPLAY_STATE = [DEFAULT_SEEN_DIR, LEGACY_SEEN_FILE, "export", DEFAULT_WATCH_STATE, DEFAULT_INDEX]
+
+def fetch_batch(api, video_ids, keyword, filters, dup_index=None):
+    """
+    Fetch details for one batch of new video IDs and filter them, without recording
+    anything yet. With dup_index, near-duplicate variants are collapsed to one
+    representative; their index entries stay pending until commit_batch().
+    Returns (results to keep, every video that passed the filters).
+    """
+    details = [VideoRecord.from_api(item) for item in api.get_videos_details(video_ids[:50])]
+    channel_ids = list(dict.fromkeys(v.channel_id for v in details if v.channel_id))
+    chinfo = {c.channel_id: c for c in map(ChannelRecord.from_api, api.get_channels_details(channel_ids))}
+
+    matched = filter_videos(details, channels_info=chinfo, **filters)
+    for record in matched:
+        channel = chinfo.get(record.channel_id)
+        record.subscriber_count = channel.subscriber_count if channel else None
+        record.keyword = keyword
+    results = matched
+    if dup_index is not None:
+        try:
+            results = collapse_near_duplicates(matched, dup_index, commit=False)
+        except Exception:
+            dup_index.rollback()
+            raise
+    return results, matched
+
+def commit_batch(matched, seen_store, dup_index=None):
+    """Mark a fetched batch as seen (collapsed variants too) and keep its index entries."""
+    for record in matched:
+        seen_store.add(record.video_id)
+    if dup_index is not None:
+        dup_index.commit()
+
+def discard_batch(dup_index=None):
+    """Drop a fetched batch that will not be kept, so it is fetched again next time."""
+    if dup_index is not None:
+        dup_index.rollback()
+
+def _advance(state, pages_per_keyword):
+    """Move the checkpoint to the next page, or to the next keyword when paging is done."""
+    next_token = state["next_page_token"]
+    if next_token and state["page"] + 1 < pages_per_keyword:
+        state["page"] += 1
+        state["page_token"] = next_token
+    else:
+        state["keyword_index"] += 1
+        state["page"] = 0
+        state["page_token"] = None
+    state["pending_ids"] = None
+    state["next_page_token"] = None
+
+def _save_progress(state, api, quota_used, checkpoint_path):
+    """Checkpoint state with the run's spend so far and the per-key ledger for its quota day."""
+    state["quota_used"] = quota_used
+    state["key_ledger"] = api.key_ledger()
+    state["quota_day"] = quota_day()
+    save_checkpoint(state, checkpoint_path)
+
+def _log_api_usage(api):
+    """Per-key spend and bandwidth for the run that just finished."""
+    log_key_usage(api.key_usage())
+    stats = api.transfer_stats()
+    log_transfer(stats)
+    print(f"Transferred {stats['bytes_on_wire']} bytes in {stats['requests']} requests "
+          f"({stats['bytes_saved']} bytes saved by compression).")
 
+def open_dup_index(settings):
+    """Near-duplicate index for this run, unless "collapse_duplicates" is switched off."""
+    return NearDuplicateIndex() if settings.get("collapse_duplicates", True) else None
+
+def make_api(settings, cassette=None):
+    """YouTubeAPI configured from saved settings (api_cap, api_keys)."""
+    return YouTubeAPI(quota_cap=settings.get("api_cap", 9500), api_keys=settings.get("api_keys"),
+                      cassette=cassette)
+
+def load_settings(settings_path):
+    """Read a saved search settings JSON file, or None if it does not exist."""
+    if not os.path.exists(settings_path):
+        return None
     with open(settings_path, "r", encoding="utf-8") as f:
-        settings = json.load(f)
+        return json.load(f)
 
+def run_search(settings, api=None, seen_store=None, resume=False, checkpoint_path=DEFAULT_CHECKPOINT,
+               output_lock=None):
+    """
+    Run one saved search end to end: search, details, filter, save and log.
+    api and seen_store may be passed in warm (e.g. by the daemon) and are updated in place.
+    output_lock is held while writing the shared export and log files, for callers
+    that run several searches at once.
+    If the keys run out of quota the run stops where it is and keeps its checkpoint
+    for --resume, without exporting or logging anything yet.
+    Returns the list of result rows ([] when stopped for quota).
+    """
     # Extract settings
     keywords = settings.get("keywords", [])
-    views_min = settings.get("views_min")
-    views_max = settings.get("views_max")
-    subs_min = settings.get("subs_min")
-    subs_max = settings.get("subs_max")
-    duration_mode = settings.get("duration", "Any")
-    duration_min = settings.get("duration_min")
-    duration_max = settings.get("duration_max")
-    region = settings.get("region")
-    language = settings.get("language")
-    skip_hidden_subs = settings.get("skip_hidden_subs", True)
     fresh_search = settings.get("fresh_search", False)
-    api_cap = settings.get("api_cap", 9500)
     pages_per_keyword = settings.get("pages_per_keyword", 1)
+    region = settings.get("region")
+    language = settings.get("language")
+    filters = settings_filters(settings)
 
-    seen_history_path = "data/seen_history.csv"
-    if fresh_search and os.path.exists(seen_history_path):
-        os.remove(seen_history_path)
-    seen_ids = read_seen_history(seen_history_path)
+    state = load_checkpoint(checkpoint_path) if resume else None
+    if state and state.get("keywords") != keywords:
+        print("Checkpoint keywords differ from settings; starting a new run.")
+        state = None
+    if state:
+        print(f"Resuming at keyword {state['keyword_index'] + 1}/{len(keywords)}, page {state['page'] + 1}.")
+    else:
+        state = new_checkpoint(keywords)
+    restore_results(state, checkpoint_path)
+    if seen_store is None:
+        seen_store = SeenStore()
+    seen_store.refresh()
+    # Fresh search ignores history for dedup but still records finds, so other nodes stay in sync
+    seen_ids = set() if fresh_search else seen_store.ids
 
-    api = YouTubeAPI(quota_cap=api_cap)
-    all_results = []
+    if api is None:
+        api = make_api(settings)
+    today = quota_day()
+    if state["quota_used"] and state.get("quota_day", today) == today:
+        # A new process starts every key at 0: carry the interrupted run's spend over.
+        # The total only stands in for checkpoints written before per-key ledgers.
+        ledger = state.get("key_ledger")
+        api.seed_quota(ledger, 0 if ledger else state["quota_used"])
+    # A warm api keeps counting across runs, so track this run's spend as a delta
+    quota_base = state["quota_used"]
+    quota_start = api.quota_used
+    api.reset_transfer_stats()
+    dup_index = open_dup_index(settings)
+
+    out_of_quota = False
+    while state["keyword_index"] < len(keywords):
+        keyword = keywords[state["keyword_index"]]
 
-    for keyword in keywords:
-        for page in range(pages_per_keyword):
+        # Search is the expensive call: persist its output before doing anything else
+        if state["pending_ids"] is None:
+            quota_before = api.quota_used
             try:
-                video_ids = api.search_videos(
+                video_ids, next_token = api.search_videos_page(
                     keyword,
+                    page_token=state["page_token"],
                     regionCode=region if region else None,
                     relevanceLanguage=language if language else None
                 )
+            except CassetteMissError:
+                raise  # a replay must not quietly turn missing recordings into empty pages
             except Exception as e:
                 print(f"API Error for '{keyword}': {e}")
-                continue
+                video_ids, next_token = [], None
+            else:
+                if api.quota_used == quota_before:
+                    # No key could pay: the page was not searched, so do not move past it
+                    out_of_quota = True
+                    break
 
             # Deduplication
-            video_ids = [vid for vid in video_ids if vid not in seen_ids]
-            if not video_ids:
-                continue
+            state["pending_ids"] = [vid for vid in video_ids if vid not in seen_ids]
+            state["next_page_token"] = next_token
+            _save_progress(state, api, quota_base + api.quota_used - quota_start, checkpoint_path)
 
+        if state["pending_ids"]:
+            quota_before = api.quota_used
             try:
-                details = api.get_videos_details(video_ids[:50])
-                channel_ids = [item["snippet"]["channelId"] for item in details if "snippet" in item]
-                channel_details = api.get_channels_details(channel_ids)
+                results, matched = fetch_batch(api, state["pending_ids"], keyword, filters,
+                                               dup_index=dup_index)
+            except CassetteMissError:
+                raise
             except Exception as e:
                 print(f"Details error for '{keyword}': {e}")
-                continue
+                results = []
+            else:
+                if api.quota_used - quota_before < api.VIDEOS_LIST_COST + api.CHANNELS_LIST_COST:
+                    # Keep pending_ids so --resume fetches them without paying for the search again
+                    discard_batch(dup_index)
+                    out_of_quota = True
+                    break
+                commit_batch(matched, seen_store, dup_index)
+            append_results(state, [r.to_dict() for r in results], checkpoint_path)
+            seen_ids.update(r.video_id for r in results)
 
-            # Build channel info dict
-            chinfo = {}
-            for item in channel_details:
-                cid = item["id"]
-                chinfo[cid] = {
-                    "subscriberCount": item["statistics"].get("subscriberCount", "0"),
-                    "hiddenSubscriberCount": item["statistics"].get("hiddenSubscriberCount", False),
-                }
-
-            filtered = filter_videos(
-                details,
-                views_min=views_min,
-                views_max=views_max,
-                duration_min=duration_min,
-                duration_max=duration_max,
-                region=region,
-                language=language,
-                subs_min=subs_min,
-                subs_max=subs_max,
-                skip_hidden_subs=skip_hidden_subs,
-                channels_info=chinfo,
-            )
-
-            for item in filtered:
-                title = item["snippet"]["title"]
-                description = item["snippet"]["description"]
-                tags = item["snippet"].get("tags", [])
-                channel = item["snippet"]["channelTitle"]
-                channel_id = item["snippet"]["channelId"]
-                video_id = item["id"]
-                views = item["statistics"].get("viewCount", "0")
-                subs = chinfo[channel_id].get("subscriberCount", "0")
-                duration_seconds = 0
-                try:
-                    import isodate
-                    duration_seconds = int(isodate.parse_duration(item["contentDetails"]["duration"]).total_seconds())
-                except Exception:
-                    pass
-                published = item["snippet"]["publishedAt"][:10]
-                all_results.append({
-                    "title": title,
-                    "description": description,
-                    "tags": tags,
-                    "video_url": f"https://www.youtube.com/watch?v={video_id}",
-                    "video_id": video_id,
-                    "channel_title": channel,
-                    "channel_id": channel_id,
-                    "subscriber_count": subs,
-                    "view_count": views,
-                    "duration_minutes": duration_seconds // 60,
-                    "published_at": published,
-                    "keyword": keyword,
-                })
-                append_seen_history(video_id, out_file=seen_history_path)
+        _advance(state, pages_per_keyword)
+        _save_progress(state, api, quota_base + api.quota_used - quota_start, checkpoint_path)
 
-    if all_results:
-        save_results_csv(all_results, keyword=";".join(keywords))
-        print(f"Saved {len(all_results)} results to CSV.")
-        # Add this logging call:
+    seen_store.flush()
+    if dup_index is not None:
+        dup_index.close()
+    if out_of_quota:
+        print(f"Quota ran out at keyword {state['keyword_index'] + 1}/{len(keywords)}, "
+              f"page {state['page'] + 1}; checkpoint kept. Run with --resume once the quota resets.")
+        return []
+
+    all_results = [VideoRecord.from_dict(d) for d in load_results(state, checkpoint_path)]
+    # export/results_<date>.csv and the logs are appended to by every run of the day
+    with output_lock or contextlib.nullcontext():
+        if all_results:
+            save_results_csv(all_results, keyword=";".join(keywords))
+            print(f"Saved {len(all_results)} results to CSV.")
+        else:
+            print("No results found.")
+        # Log even for empty results
         log_run(
             keywords_count=len(keywords),
             results_count=len(all_results),
-            quota_used=api.quota_used
+            quota_used=state["quota_used"]
         )
+        _log_api_usage(api)
+    clear_checkpoint(checkpoint_path)
+    return all_results
+
+def settings_filters(settings):
+    return {
+        "views_min": settings.get("views_min"),
+        "views_max": settings.get("views_max"),
+        "duration_min": settings.get("duration_min"),
+        "duration_max": settings.get("duration_max"),
+        "region": settings.get("region"),
+        "language": settings.get("language"),
+        "subs_min": settings.get("subs_min"),
+        "subs_max": settings.get("subs_max"),
+        "skip_hidden_subs": settings.get("skip_hidden_subs", True),
+    }
+
+def run_channel_crawl(settings, api=None, seen_store=None):
+    """
+    Discover new uploads from watched channels through their uploads playlists
+    (1 unit per page instead of 100 per search) and run them through the usual
+    details/filter path. Watched channels come from settings "watch_channels",
+    or every channel in export/ when that is empty.
+    """
+    if api is None:
+        api = make_api(settings)
+    if seen_store is None:
+        seen_store = SeenStore()
+    seen_ids = seen_store.refresh()
+    quota_start = api.quota_used
+    api.reset_transfer_stats()
+    filters = settings_filters(settings)
+    channel_ids = sorted(settings.get("watch_channels") or channels_from_exports())
+    watch_state = load_watch_state()
+    dup_index = open_dup_index(settings)
+
+    all_results = []
+    for channel_id in channel_ids:
+        try:
+            new_ids, newest, complete = crawl_channel_uploads(api, channel_id,
+                                                              last_seen=watch_state.get(channel_id))
+        except CassetteMissError:
+            raise
+        except Exception as e:
+            print(f"Uploads error for '{channel_id}': {e}")
+            continue
+        if not complete:
+            print(f"Quota ran out while listing uploads of '{channel_id}'; will retry next run.")
+        new_ids = [vid for vid in new_ids if vid not in seen_ids]
+        # The watermark only moves once every page and batch for the channel went through;
+        # otherwise the next crawl would never look at the uploads we missed
+        for i in range(0, len(new_ids), 50):
+            quota_before = api.quota_used
+            try:
+                results, matched = fetch_batch(api, new_ids[i:i + 50], "uploads", filters,
+                                               dup_index=dup_index)
+            except CassetteMissError:
+                raise
+            except Exception as e:
+                print(f"Details error for '{channel_id}': {e}")
+                complete = False
+                continue
+            if api.quota_used - quota_before < api.VIDEOS_LIST_COST + api.CHANNELS_LIST_COST:
+                # A call found no key with budget left and came back empty
+                print(f"Quota ran out while crawling '{channel_id}'; will retry next run.")
+                discard_batch(dup_index)
+                complete = False
+                continue
+            commit_batch(matched, seen_store, dup_index)
+            all_results.extend(results)
+            seen_ids.update(r.video_id for r in results)
+        if newest and complete:
+            watch_state[channel_id] = newest
+    save_watch_state(watch_state)
+    seen_store.flush()
+    if dup_index is not None:
+        dup_index.close()
+
+    if all_results:
+        save_results_csv(all_results, keyword="uploads")
+        print(f"Saved {len(all_results)} results from {len(channel_ids)} channels to CSV.")
     else:
-        print("No results found.")
-        # Log even for empty results:
-        log_run(
-            keywords_count=len(keywords),
-            results_count=0,
-            quota_used=api.quota_used
-        )
+        print(f"No new uploads in {len(channel_ids)} watched channels.")
+    log_run(
+        keywords_count=0,
+        results_count=len(all_results),
+        quota_used=api.quota_used - quota_start
+    )
+    _log_api_usage(api)
+    return all_results
+
+def run_refresh(settings, api=None):
+    """
+    Re-poll statistics for every tracked video and rank them by views/hour.
+    Costs 1 unit per 50 videos, so this is far cheaper than a search run.
+    """
+    if api is None:
+        api = make_api(settings)
+    quota_start = api.quota_used
+    api.reset_transfer_stats()
+    video_ids = tracked_video_ids()
+    written, failed = refresh_statistics(api, video_ids)
+    ranked = compute_velocity()
+    if ranked:
+        path = save_velocity_csv(ranked)
+        print(f"Refreshed {written} of {len(video_ids)} videos; ranking saved to {path}.")
+    else:
+        print("No tracked videos to refresh.")
+    log_run(
+        keywords_count=0,
+        results_count=written,
+        quota_used=api.quota_used - quota_start,
+        error=f"{failed} statistics batches failed" if failed else None
+    )
+    _log_api_usage(api)
+    return ranked
+
+def state_snapshot_dir(cassette_path):
+    """Where --record keeps the starting state that --replay of this cassette needs."""
+    return cassette_path + ".state"
+
+def copy_state(src, dst, paths):
+    """Copy the relative paths that exist under src to the same place under dst."""
+    for rel in paths:
+        source = os.path.join(src, rel)
+        target = os.path.join(dst, rel)
+        if os.path.isdir(source):
+            shutil.copytree(source, target, dirs_exist_ok=True)
+        elif os.path.exists(source):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(source, target)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run saved YouTube Finder search headlessly.")
+    parser.add_argument("--settings", default="settings.json", help="Path to settings JSON")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the last checkpoint without repeating paid searches")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Path to checkpoint file")
+    parser.add_argument("--channels", action="store_true",
+                        help="Crawl watched channels' uploads playlists instead of searching")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Re-poll statistics of tracked videos and rank by views/hour instead of searching")
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument("--record", metavar="CASSETTE",
+                                help="Store every API response in this cassette file")
+    cassette_group.add_argument("--replay", metavar="CASSETTE",
+                                help="Serve API calls from this cassette file only (offline, no quota)")
+    args = parser.parse_args(argv)
+
+    settings = load_settings(args.settings)
+    if settings is None:
+        print(f"ERROR: {args.settings} not found.")
+        return
+
+    cassette = None
+    if args.record:
+        cassette = Cassette(args.record, RECORD)
+    elif args.replay:
+        cassette = Cassette(args.replay, REPLAY)
+    api = make_api(settings, cassette=cassette)
+
+    workdir = os.getcwd()
+    state_paths = list(REPLAY_STATE)
+    if args.resume and not os.path.isabs(args.checkpoint):
+        state_paths += [args.checkpoint, results_path(args.checkpoint)]
+    if args.record:
+        # Keep the state this recording starts from; replaying it from anything else
+        # asks for requests that were never made (e.g. details for IDs seen back then)
+        snapshot = state_snapshot_dir(args.record)
+        shutil.rmtree(snapshot, ignore_errors=True)
+        copy_state(workdir, snapshot, state_paths)
+    elif args.replay:
+        # Every path the pipeline writes (export/, data/, logs/) is relative: run the replay in a
+        # scratch directory seeded with the recording's starting state, so the real history
+        # stays untouched
+        scratch = tempfile.mkdtemp(prefix="youtube-finder-replay-")
+        copy_state(state_snapshot_dir(os.path.abspath(args.replay)), scratch, state_paths)
+        os.chdir(scratch)
+        print(f"Replaying into {scratch} (exports, seen history and logs stay there).")
+
+    try:
+        if args.refresh:
+            run_refresh(settings, api=api)
+        elif args.channels:
+            run_channel_crawl(settings, api=api)
+        else:
+            run_search(settings, api=api, resume=args.resume, checkpoint_path=args.checkpoint)
+    except CassetteMissError as e:
+        print(f"ERROR: {e}")
+        raise SystemExit(1)
+    finally:
+        if cassette:
+            stats = cassette.stats()
+            print(f"Cassette {cassette.path}: {stats['requests']} requests, "
+                  f"{stats['bodies']} distinct bodies, {stats['stored_bytes']} bytes stored.")
+            cassette.close()
+        os.chdir(workdir)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
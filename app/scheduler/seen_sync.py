@@ -0,0 +1,35 @@
+import sys
+import os
+import argparse
+# Add app/ to sys.path for core/ imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.seen_store import SeenStore, DEFAULT_SEEN_DIR
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Share seen history between machines through a common directory."
+    )
+    parser.add_argument("command", choices=["import", "export", "sync", "compact", "stats"],
+                        help="import: pull segments from DIR; export: push local segments to DIR; "
+                             "sync: both; compact: merge local segments; stats: show counts")
+    parser.add_argument("dir", nargs="?", help="Shared directory (import/export/sync)")
+    parser.add_argument("--root", default=DEFAULT_SEEN_DIR, help="Local seen-history directory")
+    parser.add_argument("--node", default=None, help="Node name used in segment file names")
+    args = parser.parse_args(argv)
+
+    if args.command in ("import", "export", "sync") and not args.dir:
+        parser.error(f"{args.command} needs a shared directory")
+
+    store = SeenStore(root=args.root, node=args.node)
+    if args.command in ("import", "sync"):
+        print(f"Imported {store.import_from(args.dir)} segments from {args.dir}.")
+    if args.command in ("export", "sync"):
+        print(f"Exported {store.export_to(args.dir)} segments to {args.dir}.")
+    if args.command == "compact":
+        print(f"Compacted {store.compact()} segments.")
+    store.refresh()
+    print(f"{len(store)} seen videos in {len(store.segment_names())} segments.")
+
+if __name__ == "__main__":
+    main()
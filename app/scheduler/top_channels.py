@@ -0,0 +1,66 @@
+import sys
+import os
+import argparse
+# Add app/ to sys.path for core/ imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.channel_rollups import ChannelRollups, DEFAULT_ROLLUPS, SCORES, format_score, parse_weights
+from scheduler.headless import load_settings
+
+def print_top(rows, rollups):
+    if not rows:
+        print("No channels in the rollups yet.")
+        return
+    print(f"{'#':>3}  {'score':>14}  {'subs':>12}  {'views':>14}  {'videos':>6}  {'hits':>5}  "
+          f"{'first seen':<10}  {'last seen':<10}  channel")
+    for rank, row in enumerate(rows, 1):
+        subs = "hidden" if row["subscriber_count"] is None else f"{row['subscriber_count']:,}"
+        keywords = ", ".join(f"{kw} ({n})" for kw, n in rollups.top_keywords(row["channel_id"]))
+        print(f"{rank:>3}  {format_score(row['score']):>14}  {subs:>12}  {row['total_views']:>14,}  "
+              f"{row['videos']:>6}  {row['keyword_hits']:>5}  {row['first_seen']:<10}  {row['last_seen']:<10}  "
+              f"{row['channel_title']} [{row['channel_id']}]  {keywords}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank channels from the incrementally maintained rollups.")
+    parser.add_argument("command", nargs="?", default="top", choices=["top", "rebuild"],
+                        help="top: show the best channels; rebuild: recompute rollups from export/results_*.csv")
+    parser.add_argument("-k", type=int, default=20, help="Number of channels to show")
+    parser.add_argument("--score", default=None, choices=list(SCORES),
+                        help="Rank by this score (default: channel_score in settings, else views)")
+    parser.add_argument("--weights", default=None,
+                        help="Weighted log-scale score, e.g. 'views=1,hits=2' (overrides --score)")
+    parser.add_argument("--keyword", default=None, help="Only channels hit by this keyword")
+    parser.add_argument("--min-videos", type=int, default=1, help="Ignore channels with fewer videos")
+    parser.add_argument("--settings", default="settings.json", help="Path to settings JSON")
+    parser.add_argument("--rollups", default=DEFAULT_ROLLUPS, help="Path to the rollup database")
+    parser.add_argument("--export-dir", default="export", help="Exports to read for 'rebuild'")
+    args = parser.parse_args(argv)
+
+    rollups = ChannelRollups(args.rollups)
+    try:
+        if args.command == "rebuild":
+            rows = rollups.rebuild_from_exports(args.export_dir)
+            print(f"Rebuilt rollups for {len(rollups)} channels from {rows} exported rows.")
+            return
+
+        settings = load_settings(args.settings) or {}
+        try:
+            if args.weights:
+                weights = parse_weights(args.weights)
+            else:
+                # An explicit --score beats weights saved in settings
+                weights = None if args.score else settings.get("channel_score_weights")
+        except ValueError as e:
+            parser.error(str(e))
+        score = args.score or settings.get("channel_score", "views")
+        rows = rollups.top(k=args.k, score=score, weights=weights,
+                           keyword=args.keyword, min_videos=args.min_videos)
+        label = ", ".join(f"{name}={w:g}" for name, w in weights.items()) if weights else score
+        print(f"Top {args.k} channels by {label}"
+              f"{f' for keyword {args.keyword!r}' if args.keyword else ''}:")
+        print_top(rows, rollups)
+    finally:
+        rollups.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import sys
+import os
+import json
+import time
+import argparse
+# Add app/ to sys.path for core/ imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.youtube_api import YouTubeAPI
+from core.job_queue import JobQueue, DEFAULT_QUEUE, DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS
+from core.seen_store import SeenStore, default_node_name
+from scheduler.headless import (
+    fetch_batch,
+    commit_batch,
+    discard_batch,
+    settings_filters,
+    open_dup_index,
+    make_api
+)
+
+# Worst case for one task: the search page plus one details and one channels call
+TASK_QUOTA = YouTubeAPI.SEARCH_LIST_COST + YouTubeAPI.VIDEOS_LIST_COST + YouTubeAPI.CHANNELS_LIST_COST
+
+def run_task(queue, task, owner, api, settings, seen_store, dup_index, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Search one keyword page and commit its results. Returns the number of results committed."""
+    run_id = task["run_id"]
+    if not queue.reserve_quota(run_id, TASK_QUOTA):
+        # The run's api_cap is spent: this page will never be affordable
+        queue.fail(task, owner, "api_cap reached", max_attempts=0)
+        print(f"[{owner}] api_cap reached for run {run_id}; skipping '{task['keyword']}' page {task['page'] + 1}")
+        return 0
+
+    region = settings.get("region")
+    language = settings.get("language")
+    quota_start = api.quota_used
+    try:
+        video_ids, next_token = api.search_videos_page(
+            task["keyword"],
+            page_token=task["page_token"],
+            regionCode=region if region else None,
+            relevanceLanguage=language if language else None
+        )
+        seen_store.refresh()
+        new_ids = [vid for vid in video_ids if vid not in seen_store]
+        records, matched = [], []
+        if new_ids:
+            records, matched = fetch_batch(api, new_ids, task["keyword"], settings_filters(settings),
+                                           dup_index=dup_index)
+    except Exception as e:
+        queue.adjust_quota(run_id, api.quota_used - quota_start - TASK_QUOTA)
+        queue.fail(task, owner, e, max_attempts=max_attempts)
+        print(f"[{owner}] '{task['keyword']}' page {task['page'] + 1} failed (attempt {task['attempts']}): {e}")
+        return 0
+
+    # Return whatever part of the reservation was not spent
+    queue.adjust_quota(run_id, api.quota_used - quota_start - TASK_QUOTA)
+    paid = YouTubeAPI.SEARCH_LIST_COST
+    if new_ids:
+        paid += YouTubeAPI.VIDEOS_LIST_COST + YouTubeAPI.CHANNELS_LIST_COST
+    if api.quota_used - quota_start < paid:
+        # A call found no key with budget left and came back empty: the page was not
+        # really searched, so hand it back instead of completing it with no results
+        discard_batch(dup_index)
+        queue.release(task, owner)
+        print(f"[{owner}] out of quota on '{task['keyword']}' page {task['page'] + 1}; task released")
+        return 0
+    # Seen history and the duplicate index only record the batch once its results
+    # are committed, so a retried task finds the same videos again
+    try:
+        completed = queue.complete(task, owner, records, next_token, settings.get("pages_per_keyword", 1))
+    except Exception as e:
+        discard_batch(dup_index)
+        queue.fail(task, owner, e, max_attempts=max_attempts)
+        print(f"[{owner}] commit failed on '{task['keyword']}' page {task['page'] + 1} "
+              f"(attempt {task['attempts']}): {e}")
+        return 0
+    if not completed:
+        discard_batch(dup_index)
+        print(f"[{owner}] lease lost on '{task['keyword']}' page {task['page'] + 1}; results discarded")
+        return 0
+    commit_batch(matched, seen_store, dup_index)
+    return len(records)
+
+def run_worker(queue_path=DEFAULT_QUEUE, owner=None, exit_when_idle=False, poll_seconds=5,
+               lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Claim and run tasks until the queue is empty (exit_when_idle) or forever."""
+    owner = owner or f"{default_node_name()}-{os.getpid()}"
+    queue = JobQueue(queue_path)
+    # Each worker journals under its own name so concurrent appends never interleave
+    seen_store = SeenStore(node=owner)
+    apis = {}
+    dup_indexes = {}
+    done = 0
+    try:
+        while True:
+            task = queue.claim(owner, lease_seconds=lease_seconds, max_attempts=max_attempts)
+            if task is None:
+                if exit_when_idle:
+                    break
+                time.sleep(poll_seconds)
+                continue
+
+            settings = queue.run_settings(task["run_id"])
+            api_keys = settings.get("api_keys")
+            ident = json.dumps(api_keys, sort_keys=True) if api_keys else "env"
+            if ident not in apis:
+                apis[ident] = make_api(settings)
+            dup_key = bool(settings.get("collapse_duplicates", True))
+            if dup_key not in dup_indexes:
+                dup_indexes[dup_key] = open_dup_index(settings)
+
+            api = apis[ident]
+            if not api.can_afford(TASK_QUOTA):
+                # Nothing resets this worker's keys: leave the task to a worker that can pay
+                queue.release(task, owner)
+                print(f"[{owner}] API keys are out of quota; stopping.")
+                break
+            done += run_task(queue, task, owner, api, settings, seen_store,
+                             dup_indexes[dup_key], max_attempts=max_attempts)
+    finally:
+        seen_store.flush()
+        for dup_index in dup_indexes.values():
+            if dup_index is not None:
+                dup_index.close()
+        queue.close()
+    print(f"[{owner}] idle; committed {done} results.")
+    return done
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Claim keyword/page tasks from the shared job queue.")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE, help="Path to the queue database")
+    parser.add_argument("--exit-when-idle", action="store_true", help="Stop once no task is claimable")
+    parser.add_argument("--lease", type=int, default=DEFAULT_LEASE_SECONDS, help="Lease length in seconds")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS, help="Tries per task")
+    args = parser.parse_args(argv)
+
+    run_worker(
+        queue_path=args.queue,
+        exit_when_idle=args.exit_when_idle,
+        lease_seconds=args.lease,
+        max_attempts=args.max_attempts,
+    )
+
+if __name__ == "__main__":
+    main()
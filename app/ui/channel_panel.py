@@ -0,0 +1,111 @@
+import webbrowser
+import customtkinter as ctk
+from tkinter import messagebox
+
+from core.channel_rollups import ChannelRollups, DEFAULT_ROLLUPS, SCORES, format_score, parse_weights
+
+ALL_KEYWORDS = "(all keywords)"
+
+class TopChannelsWindow(ctk.CTkToplevel):
+    """Top-K channels from the rollup store, re-ranked on demand."""
+
+    HEADERS = ["#", "Channel", "Score", "Subs", "Views", "Videos", "Hits", "First seen", "Last seen", ""]
+    WEIGHTS = [0, 3, 1, 1, 1, 1, 1, 1, 1, 0]
+
+    def __init__(self, master, rollup_path=DEFAULT_ROLLUPS, score="views", weights=None):
+        super().__init__(master)
+        self.title("Top Channels")
+        self.geometry("1000x560")
+        self.rollups = ChannelRollups(rollup_path)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        controls = ctk.CTkFrame(self, fg_color="transparent")
+        controls.pack(fill="x", padx=10, pady=(10, 0))
+
+        ctk.CTkLabel(controls, text="Score:").pack(side="left", padx=(0, 4))
+        self.score_var = ctk.StringVar(value=score if score in SCORES else "views")
+        ctk.CTkOptionMenu(controls, variable=self.score_var, values=list(SCORES),
+                          command=lambda _: self.refresh()).pack(side="left", padx=(0, 10))
+
+        ctk.CTkLabel(controls, text="Weights:").pack(side="left", padx=(0, 4))
+        self.weights_entry = ctk.CTkEntry(controls, width=160, placeholder_text="e.g. views=1,hits=2")
+        if weights:
+            self.weights_entry.insert(0, ",".join(f"{name}={w:g}" for name, w in weights.items()))
+        self.weights_entry.pack(side="left", padx=(0, 10))
+
+        ctk.CTkLabel(controls, text="Keyword:").pack(side="left", padx=(0, 4))
+        self.keyword_var = ctk.StringVar(value=ALL_KEYWORDS)
+        self.keyword_menu = ctk.CTkOptionMenu(controls, variable=self.keyword_var,
+                                              values=[ALL_KEYWORDS] + self.rollups.keywords(),
+                                              command=lambda _: self.refresh())
+        self.keyword_menu.pack(side="left", padx=(0, 10))
+
+        ctk.CTkLabel(controls, text="Top:").pack(side="left", padx=(0, 4))
+        self.k_entry = ctk.CTkEntry(controls, width=50)
+        self.k_entry.insert(0, "50")
+        self.k_entry.pack(side="left", padx=(0, 10))
+
+        ctk.CTkButton(controls, text="Refresh", width=80, command=self.refresh).pack(side="left")
+        self.weights_entry.bind("<Return>", lambda e: self.refresh())
+        self.k_entry.bind("<Return>", lambda e: self.refresh())
+
+        self.table = ctk.CTkScrollableFrame(self)
+        self.table.pack(fill="both", expand=True, padx=10, pady=10)
+        self.refresh()
+
+    def refresh(self):
+        try:
+            k = max(int(self.k_entry.get() or 50), 1)
+        except ValueError:
+            k = 50
+        try:
+            weights = parse_weights(self.weights_entry.get())
+        except ValueError as e:
+            messagebox.showwarning("Invalid Weights", str(e), parent=self)
+            return
+        # New searches may have added keywords since the panel opened
+        self.keyword_menu.configure(values=[ALL_KEYWORDS] + self.rollups.keywords())
+        keyword = self.keyword_var.get()
+        rows = self.rollups.top(k=k, score=self.score_var.get(), weights=weights or None,
+                                keyword=None if keyword == ALL_KEYWORDS else keyword)
+        self._render(rows)
+
+    def _render(self, rows):
+        for widget in self.table.winfo_children():
+            widget.destroy()
+        self._add_row(self.HEADERS, bold=True)
+        if not rows:
+            self._add_row(["", "No channels yet - run a search or rebuild from exports", "", "", "", "", "", "", "", ""])
+            return
+        for rank, row in enumerate(rows, 1):
+            self._add_row([
+                rank,
+                row["channel_title"] or row["channel_id"],
+                format_score(row["score"]),
+                "hidden" if row["subscriber_count"] is None else f"{row['subscriber_count']:,}",
+                f"{row['total_views']:,}",
+                row["videos"],
+                row["keyword_hits"],
+                row["first_seen"],
+                row["last_seen"],
+            ], channel_id=row["channel_id"])
+
+    def _add_row(self, values, channel_id=None, bold=False):
+        row_frame = ctk.CTkFrame(self.table)
+        row_frame.pack(fill="x", pady=1)
+        font = ctk.CTkFont(size=13, weight="bold") if bold else None
+        for idx, val in enumerate(values):
+            text = str(val)
+            if idx == 1 and len(text) > 40:
+                text = text[:37] + "..."
+            ctk.CTkLabel(row_frame, text=text, anchor="w", font=font).grid(row=0, column=idx, padx=4, sticky="w")
+            row_frame.grid_columnconfigure(idx, weight=self.WEIGHTS[idx], minsize=30 if idx == 0 else 80)
+        if channel_id:
+            ctk.CTkButton(
+                row_frame, text="Open", width=50, height=24,
+                command=lambda c=channel_id: webbrowser.open(f"https://www.youtube.com/channel/{c}")
+            ).grid(row=0, column=len(self.HEADERS) - 1, padx=4, pady=2, sticky="e")
+
+    def _on_close(self):
+        self.rollups.close()
+        self.destroy()
@@ -0,0 +1,154 @@
+import io
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import customtkinter as ctk
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow missing: the thumbnail column stays empty
+    Image = None
+
+THUMBNAIL_URL = "https://i.ytimg.com/vi/{video_id}/mqdefault.jpg"
+THUMBNAIL_SIZE = (96, 54)
+
+class ImageLRU:
+    """Decoded thumbnails bounded by total pixel bytes, least recently used evicted first."""
+
+    def __init__(self, max_bytes=32 * 2**20):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.items = OrderedDict()
+
+    @staticmethod
+    def _cost(image):
+        return image.width * image.height * len(image.getbands())
+
+    def get(self, key):
+        image = self.items.get(key)
+        if image is not None:
+            self.items.move_to_end(key)
+        return image
+
+    def put(self, key, image):
+        if key in self.items:
+            self.size -= self._cost(self.items.pop(key))
+        self.items[key] = image
+        self.size += self._cost(image)
+        while self.size > self.max_bytes and len(self.items) > 1:
+            _, evicted = self.items.popitem(last=False)
+            self.size -= self._cost(evicted)
+
+class ThumbnailLoader:
+    """
+    Loads video thumbnails off the Tk thread.
+
+    Worker threads read the on-disk cache (downloading on a miss), decode and
+    resize. Finished images are handed back through a queue that the Tk thread
+    drains with after(), so widgets are only touched on the Tk thread. Only
+    requested (visible) rows are loaded; release() drops a row's image when it
+    scrolls away, and requests released before a worker picks them up are skipped.
+    """
+
+    def __init__(self, root, cache_dir="data/thumbnails", max_bytes=32 * 2**20, workers=4,
+                 size=THUMBNAIL_SIZE, poll_ms=50):
+        self.root = root
+        self.cache_dir = cache_dir
+        self.size = size
+        self.poll_ms = poll_ms
+        self.memory = ImageLRU(max_bytes)
+        self.labels = {}
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.ready = queue.Queue()
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbs")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.root.after(self.poll_ms, self._drain)
+
+    @property
+    def available(self):
+        return Image is not None
+
+    def request(self, video_id, label):
+        """Show video_id's thumbnail in label as soon as it is available."""
+        if not self.available:
+            return
+        self.labels[video_id] = label
+        image = self.memory.get(video_id)
+        if image is not None:
+            self._show(video_id, image)
+            return
+        with self.lock:
+            if video_id in self.pending:
+                return
+            self.pending.add(video_id)
+        self.executor.submit(self._load, video_id)
+
+    def release(self, video_id):
+        """Row left the viewport: drop its Tk image and stop wanting it."""
+        label = self.labels.pop(video_id, None)
+        if label is not None:
+            try:
+                label.configure(image=None)
+                label.image = None
+            except Exception:
+                pass
+
+    def clear(self):
+        for video_id in list(self.labels):
+            self.release(video_id)
+
+    def _load(self, video_id):
+        try:
+            if video_id not in self.labels:
+                return  # scrolled away before we got to it
+            path = os.path.join(self.cache_dir, f"{video_id}.jpg")
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    data = f.read()
+            else:
+                resp = self.session.get(THUMBNAIL_URL.format(video_id=video_id), timeout=10)
+                resp.raise_for_status()
+                data = resp.content
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            image = Image.open(io.BytesIO(data)).convert("RGB")
+            image.thumbnail(self.size)
+            self.ready.put((video_id, image))
+        except Exception:
+            pass
+        finally:
+            with self.lock:
+                self.pending.discard(video_id)
+
+    def _drain(self):
+        try:
+            while True:
+                video_id, image = self.ready.get_nowait()
+                self.memory.put(video_id, image)
+                if video_id in self.labels:
+                    self._show(video_id, image)
+        except queue.Empty:
+            pass
+        self.root.after(self.poll_ms, self._drain)
+
+    def _show(self, video_id, image):
+        label = self.labels.get(video_id)
+        if label is None:
+            return
+        try:
+            ctk_image = ctk.CTkImage(light_image=image, dark_image=image, size=image.size)
+            label.configure(image=ctk_image)
+            label.image = ctk_image
+        except Exception:
+            self.labels.pop(video_id, None)  # widget was destroyed
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
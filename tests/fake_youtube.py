@@ -0,0 +1,95 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+ENDPOINT_COSTS = {"search": 100, "videos": 1, "channels": 1, "playlistItems": 1}
+
+class FakeYouTube:
+    """
+    Local stand-in for the YouTube Data API with a real daily quota per key.
+
+    caps: {api_key: units}. A call the key cannot pay for gets the same 403
+    quotaExceeded error Google sends. Unknown keys get 400 keyInvalid.
+    calls records (endpoint, key) for every request, answered or not.
+    Use as a context manager; base_url is what YouTubeAPI(base_url=...) needs.
+    """
+
+    def __init__(self, caps):
+        self.caps = dict(caps)
+        self.used = {key: 0 for key in caps}
+        self.calls = []
+        self.lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/youtube/v3"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handle(self, request):
+        url = urlparse(request.path)
+        endpoint = url.path.rsplit("/", 1)[-1]
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        key = params.get("key")
+        cost = ENDPOINT_COSTS.get(endpoint)
+        with self.lock:
+            self.calls.append((endpoint, key))
+            if cost is None:
+                return self._send(request, 404, self._error(404, "notFound"))
+            if key not in self.caps:
+                return self._send(request, 400, self._error(400, "keyInvalid"))
+            if self.used[key] + cost > self.caps[key]:
+                return self._send(request, 403, self._error(403, "quotaExceeded"))
+            self.used[key] += cost
+        self._send(request, 200, self._body(endpoint, params))
+
+    @staticmethod
+    def _error(code, reason):
+        return {"error": {"code": code, "errors": [{"reason": reason, "domain": "youtube.quota"}]}}
+
+    @staticmethod
+    def _body(endpoint, params):
+        if endpoint == "search":
+            q = params.get("q", "")
+            return {"items": [{"id": {"videoId": f"{q}-{i}"}} for i in range(3)]}
+        if endpoint == "videos":
+            ids = [i for i in params.get("id", "").split(",") if i]
+            return {"items": [{
+                "id": vid,
+                "snippet": {"title": vid, "channelId": "UCfake", "channelTitle": "Fake",
+                            "publishedAt": "2026-01-01T00:00:00Z"},
+                "statistics": {"viewCount": "10"},
+                "contentDetails": {"duration": "PT3M"},
+            } for vid in ids]}
+        if endpoint == "channels":
+            ids = [i for i in params.get("id", "").split(",") if i]
+            return {"items": [{"id": cid, "statistics": {"subscriberCount": "5"}} for cid in ids]}
+        return {"items": []}
+
+    @staticmethod
+    def _send(request, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.youtube_api import YouTubeAPI
+from fake_youtube import FakeYouTube
+
+class KeyRotationTest(unittest.TestCase):
+    """YouTubeAPI against a local endpoint where each key runs out of quota."""
+
+    def make_api(self, fake, keys, cap=10_000):
+        # The client-side cap is deliberately generous: only the server knows the real quota
+        return YouTubeAPI(api_keys=keys, quota_cap=cap, base_url=fake.base_url)
+
+    def test_routes_to_key_with_most_budget(self):
+        with FakeYouTube({"key-a": 1000, "key-b": 1000}) as fake:
+            api = self.make_api(fake, [{"key": "key-a", "cap": 150}, {"key": "key-b", "cap": 400}])
+            api.search_videos("first")
+            api.search_videos("second")
+            self.assertEqual([key for _, key in fake.calls], ["key-b", "key-b"])
+            api.search_videos("third")
+            # key-b is down to 200, key-a still has 150 -> key-b; then 150 vs 100 -> key-a
+            api.search_videos("fourth")
+            self.assertEqual([key for _, key in fake.calls], ["key-b", "key-b", "key-b", "key-a"])
+
+    def test_retires_exhausted_key_and_retries_on_next(self):
+        with FakeYouTube({"key-a": 100, "key-b": 1000}) as fake:
+            # key-a looks richer to the client, so it is tried first until the server refuses it
+            api = self.make_api(fake, ["key-a", {"key": "key-b", "cap": 5000}])
+            self.assertEqual(api.search_videos("one"), ["one-0", "one-1", "one-2"])
+            # key-a spent its real quota on the first search; the second must fail over
+            self.assertEqual(api.search_videos("two"), ["two-0", "two-1", "two-2"])
+            self.assertEqual([key for _, key in fake.calls], ["key-a", "key-a", "key-b"])
+            usage = {u["key"]: u for u in api.key_usage()}
+            self.assertTrue(usage["...ey-a"]["retired"])
+            self.assertFalse(usage["...ey-b"]["retired"])
+            # The rejected call is not charged
+            self.assertEqual(usage["...ey-a"]["quota_used"], 100)
+            self.assertEqual(usage["...ey-b"]["quota_used"], 100)
+            self.assertEqual(api.quota_used, 200)
+
+    def test_all_keys_exhausted_returns_empty(self):
+        with FakeYouTube({"key-a": 100, "key-b": 100}) as fake:
+            api = self.make_api(fake, ["key-a", "key-b"])
+            api.search_videos("one")
+            api.search_videos("two")
+            self.assertEqual(api.search_videos("three"), [])
+            self.assertTrue(all(u["retired"] for u in api.key_usage()))
+            self.assertFalse(api.can_afford(1))
+            # Once every key is retired no further requests are sent
+            calls = len(fake.calls)
+            self.assertEqual(api.get_videos_details(["x"]), [])
+            self.assertEqual(len(fake.calls), calls)
+
+    def test_cheap_calls_continue_after_search_budget_is_gone(self):
+        with FakeYouTube({"key-a": 150}) as fake:
+            api = self.make_api(fake, [{"key": "key-a", "cap": 150}])
+            video_ids = api.search_videos("one")
+            self.assertFalse(api.can_afford(YouTubeAPI.SEARCH_LIST_COST))
+            self.assertEqual(api.search_videos("two"), [])
+            details = api.get_videos_details(video_ids)
+            self.assertEqual([d["id"] for d in details], video_ids)
+            # The unaffordable search never reached the server
+            self.assertEqual([endpoint for endpoint, _ in fake.calls], ["search", "videos"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.seen_store import SeenStore
+from scheduler import headless
+from fake_youtube import FakeYouTube
+
+class RecordReplayTest(unittest.TestCase):
+    """--record against a local endpoint, then --replay of the same cassette offline."""
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.scratch = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        self.addCleanup(shutil.rmtree, self.scratch)
+        cwd = os.getcwd()
+        os.chdir(self.workdir)
+        self.addCleanup(os.chdir, cwd)
+        with open("settings.json", "w", encoding="utf-8") as f:
+            json.dump({"keywords": ["kw"], "api_keys": ["key-a"], "collapse_duplicates": False}, f)
+
+    def run_main(self, *args):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), \
+                mock.patch.object(headless.tempfile, "mkdtemp", return_value=self.scratch):
+            headless.main(["--settings", os.path.join(self.workdir, "settings.json"), *args])
+        return out.getvalue()
+
+    def test_replay_starts_from_the_recorded_seen_history(self):
+        store = SeenStore()
+        store.add("kw-0")
+        store.flush()
+        cassette = os.path.join("data", "cassettes", "kw.sqlite")
+        with FakeYouTube({"key-a": 10_000}) as fake, \
+                mock.patch.dict(os.environ, {"YOUTUBE_API_BASE_URL": fake.base_url}):
+            self.run_main("--record", cassette)
+            calls = len(fake.calls)
+            # kw-0 was already seen, so only the other two were looked up
+            self.assertIn("Saved 2 results", self.run_main("--replay", cassette))
+            self.assertEqual(len(fake.calls), calls)
+        self.assertTrue(os.listdir(os.path.join(self.scratch, "export")))
+
+    def test_refresh_replay_polls_the_recorded_exports(self):
+        with FakeYouTube({"key-a": 10_000}) as fake, \
+                mock.patch.dict(os.environ, {"YOUTUBE_API_BASE_URL": fake.base_url}):
+            self.run_main()
+            self.run_main("--refresh", "--record", "refresh.sqlite")
+            calls = len(fake.calls)
+            output = self.run_main("--refresh", "--replay", "refresh.sqlite")
+            self.assertIn("Refreshed 3 of 3 videos", output)
+            self.assertEqual(len(fake.calls), calls)
+
+if __name__ == "__main__":
+    unittest.main()